@@ -0,0 +1,228 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from config.logs.logger_config import logger
+from config.settings import get_settings
+from storage.run_history import hash_account
+
+
+class IdempotencyKeyMismatch(Exception):
+    """
+    Raised when an idempotency key is reused with a different request.
+    """
+
+
+class RunCoordinator:
+    """
+    Coordinates bot runs triggered through the API.
+
+    - Requests sharing an idempotency key attach to the run already in
+      flight instead of starting a new one.
+    - Successful results are kept in a bounded TTL cache and served again
+      for repeated keys.
+    - Runs for the same account are serialized; different accounts run
+      in parallel.
+
+    Attributes:
+        ttl_seconds (float): How long completed results are kept.
+        max_entries (int): Maximum number of cached results.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        """
+        Initializes the coordinator.
+
+        Args:
+            ttl_seconds (float): How long completed results are kept.
+            max_entries (int): Maximum number of cached results.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._results = OrderedDict()
+        self._account_locks = {}
+
+    def run(self, key, email: str, fingerprint: str, action) -> tuple:
+        """
+        Runs an action under idempotency and per-account serialization rules.
+
+        Args:
+            key (str | None): Idempotency key. Without one, the action
+                always runs (still serialized per account).
+            email (str): Account the run is for.
+            fingerprint (str): Digest of the request payload, used to detect
+                a key being reused for a different request.
+            action (Callable[[], Any]): Runs the bot and returns its result.
+
+        Returns:
+            tuple: (result, replayed) where replayed is True when the result
+            came from another request with the same key.
+
+        Raises:
+            IdempotencyKeyMismatch: If the key was used for a different request.
+            Exception: Whatever the action raised, for the owner and every
+                request attached to it.
+        """
+        if key is None:
+            return self._run_serialized(email, action), False
+
+        with self._lock:
+            self._evict_expired()
+
+            cached = self._results.get(key)
+            if cached is not None:
+                self._check_fingerprint(key, cached["fingerprint"], fingerprint)
+                self._results.move_to_end(key)
+                logger.info(
+                    f"Serving cached result for idempotency key {key!r}"
+                )
+                return cached["result"], True
+
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self._check_fingerprint(
+                    key, inflight["fingerprint"], fingerprint
+                )
+                future = inflight["future"]
+                owner = False
+            else:
+                future = Future()
+                self._inflight[key] = {
+                    "future": future,
+                    "fingerprint": fingerprint,
+                }
+                owner = True
+
+        if not owner:
+            logger.info(
+                f"Attaching to in-flight run for idempotency key {key!r}"
+            )
+            return future.result(), True
+
+        try:
+            result = self._run_serialized(email, action)
+        except Exception as error:
+            future.set_exception(error)
+            with self._lock:
+                del self._inflight[key]
+            raise
+
+        future.set_result(result)
+        with self._lock:
+            del self._inflight[key]
+            self._store(key, fingerprint, result)
+        return result, False
+
+    def _run_serialized(self, email: str, action):
+        """
+        Runs an action while holding the lock of its account.
+
+        Args:
+            email (str): Account the run is for.
+            action (Callable[[], Any]): The action to run.
+
+        Returns:
+            Any: The action result.
+        """
+        account = hash_account(email)
+        with self._lock:
+            entry = self._account_locks.setdefault(
+                account, {"lock": threading.Lock(), "users": 0}
+            )
+            entry["users"] += 1
+
+        try:
+            with entry["lock"]:
+                return action()
+        finally:
+            with self._lock:
+                entry["users"] -= 1
+                # Drop locks nobody is waiting on so the map stays small
+                if entry["users"] == 0:
+                    del self._account_locks[account]
+
+    def _store(self, key: str, fingerprint: str, result) -> None:
+        """
+        Caches a completed result, evicting the oldest entries beyond the limit.
+
+        Must be called with the coordinator lock held.
+        """
+        self._results[key] = {
+            "fingerprint": fingerprint,
+            "result": result,
+            "expires_at": time.monotonic() + self.ttl_seconds,
+        }
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def _evict_expired(self) -> None:
+        """
+        Removes expired results. Must be called with the coordinator lock held.
+        """
+        now = time.monotonic()
+        expired = [
+            key
+            for key, cached in self._results.items()
+            if cached["expires_at"] <= now
+        ]
+        for key in expired:
+            del self._results[key]
+
+    @staticmethod
+    def _check_fingerprint(key: str, expected: str, actual: str) -> None:
+        """
+        Ensures a reused key belongs to the same request payload.
+
+        Raises:
+            IdempotencyKeyMismatch: If the payloads differ.
+        """
+        if expected != actual:
+            raise IdempotencyKeyMismatch(
+                f"Idempotency key {key!r} was already used with a "
+                "different request."
+            )
+
+
+def request_fingerprint(*values) -> str:
+    """
+    Builds a digest identifying a request payload.
+
+    Args:
+        *values: Payload values, in a fixed order.
+
+    Returns:
+        str: Hex SHA-256 digest of the values.
+    """
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update(repr(value).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_run_coordinator() -> RunCoordinator:
+    """
+    Returns the process-wide run coordinator, creating it on first use.
+
+    Returns:
+        RunCoordinator: Shared coordinator instance.
+    """
+    global _coordinator
+    if _coordinator is None:
+        with _coordinator_lock:
+            if _coordinator is None:
+                settings = get_settings()
+                _coordinator = RunCoordinator(
+                    ttl_seconds=settings.idempotency_ttl_seconds,
+                    max_entries=settings.idempotency_max_entries,
+                )
+    return _coordinator
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from automation.browser_pool import get_browser_pool
+from config.logs.logger_config import logger
+from config.settings import Settings
+
+# Prewarm states reported by the health endpoint
+PREWARM_DISABLED = "disabled"
+PREWARM_PENDING = "pending"
+PREWARM_RUNNING = "running"
+PREWARM_READY = "ready"
+PREWARM_FAILED = "failed"
+
+_status = {"state": PREWARM_PENDING, "duration_ms": None, "error": None}
+_status_lock = threading.Lock()
+
+
+def _set_status(**values) -> None:
+    with _status_lock:
+        _status.update(values)
+
+
+def prewarm_status() -> dict:
+    """
+    Returns the current prewarm state.
+
+    Returns:
+        dict: State, duration in milliseconds and error, if any.
+    """
+    with _status_lock:
+        return dict(_status)
+
+
+def _prewarm(settings: Settings) -> None:
+    """
+    Imports the automation modules and launches the first long-lived browser.
+    """
+    _set_status(state=PREWARM_RUNNING)
+    started = time.perf_counter()
+    try:
+        # Importing here pays the Playwright import cost off the request path
+        import automation.test_cases.buy_bot  # noqa: F401
+
+        # The browser stays open on its pool thread and serves the first run
+        pool = get_browser_pool()
+        if pool is not None:
+            pool.prewarm(headless=True)
+
+    except Exception as error:
+        logger.exception(f"Browser prewarm failed: {error}")
+        _set_status(state=PREWARM_FAILED, error=str(error))
+        return
+
+    duration_ms = (time.perf_counter() - started) * 1000
+    _set_status(state=PREWARM_READY, duration_ms=duration_ms)
+    logger.info(f"Browser prewarmed in {duration_ms:.0f} ms")
+
+
+def start_prewarm(settings: Settings) -> None:
+    """
+    Prewarms the driver and the pooled browser in a background thread.
+
+    Nothing is started when prewarming is disabled or when runs are handed
+    to worker processes, since the API process then never opens a browser.
+
+    Args:
+        settings (Settings): Application settings.
+    """
+    if not settings.prewarm or settings.run_mode == "queue":
+        _set_status(state=PREWARM_DISABLED)
+        return
+
+    threading.Thread(
+        target=_prewarm, args=(settings,), name="browser-prewarm", daemon=True
+    ).start()
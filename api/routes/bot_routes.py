@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
 from pydantic import BaseModel
-from automation.test_cases.buy_bot import BuyBot
-from config.settings import Settings
+from typing import Optional
+from api.idempotency import (
+    IdempotencyKeyMismatch,
+    get_run_coordinator,
+    request_fingerprint,
+)
+from automation.browser_pool import run_in_browser
+from config.settings import Settings, get_settings
+from jobs.job_queue import JOB_SUCCEEDED, JobTimeout, get_job_queue
+from storage.run_history import STATUS_SUCCESS, hash_account
 import traceback
 
 # Create a FastAPI router instance for organizing endpoints
@@ -35,8 +43,121 @@ class RunBotResponse(BaseModel):
 
 # -------------------- Endpoint Implementation --------------------
 
+def _execute_purchase_flow(
+    request: RunBotRequest, idempotency_key: Optional[str], fingerprint: str
+) -> RunBotResponse:
+    """
+    Runs the purchase flow for a request.
+
+    Args:
+        request (RunBotRequest): Request body containing login credentials and settings.
+        idempotency_key (str, optional): Value of the `Idempotency-Key` header.
+        fingerprint (str): Digest of the request payload.
+
+    Returns:
+        RunBotResponse: Success response once the flow has completed.
+
+    Raises:
+        RuntimeError: If the flow finished with a failed step.
+    """
+    # Load the shared settings; the headless flag comes from the request
+    settings = get_settings()
+
+    if settings.run_mode == "queue":
+        return _enqueue_purchase_flow(
+            request, settings, idempotency_key, fingerprint
+        )
+
+    # Imported here so the API starts without loading Playwright
+    from automation.test_cases.buy_bot import BuyBot
+
+    # Instantiate the BuyBot with user-provided credentials and settings
+    bot = BuyBot(
+        email=request.email,
+        password=request.password,
+        headless=request.headless,
+        url=settings.amazon_url,
+        har_mode=settings.har_mode,
+        har_path=settings.har_path,
+        pipeline_tabs=settings.pipeline_tabs,
+        launch_profile=settings.launch_profile,
+    )
+
+    # Run the automation flow (e.g., login, search, add to cart) in a
+    # long-lived browser, on the pool thread that owns it
+    run = run_in_browser(bot.run_purchase_flow, headless=request.headless)
+
+    # Raising keeps a failed run out of the idempotency cache
+    if run.status != STATUS_SUCCESS:
+        raise RuntimeError(
+            f"Purchase flow failed at step {run.error_step!r}: "
+            f"{run.error_message}"
+        )
+
+    return RunBotResponse(success=True, message="Purchase flow completed successfully.")
+
+def _enqueue_purchase_flow(
+    request: RunBotRequest,
+    settings: Settings,
+    idempotency_key: Optional[str],
+    fingerprint: str,
+) -> RunBotResponse:
+    """
+    Hands the purchase flow to a worker through the job queue and waits for it.
+
+    The job id is derived from the idempotency key, so a retry sent to any
+    API node attaches to the same job. Jobs are grouped by account so
+    workers never run two flows of one account at once. A job no worker
+    has started when the wait times out is cancelled, which drops the
+    credentials it carries.
+
+    Args:
+        request (RunBotRequest): Request body containing login credentials and settings.
+        settings (Settings): Loaded application settings.
+        idempotency_key (str, optional): Value of the `Idempotency-Key` header.
+        fingerprint (str): Digest of the request payload.
+
+    Returns:
+        RunBotResponse: The result reported by the worker.
+
+    Raises:
+        RuntimeError: If the worker reports a failure.
+        JobTimeout: If no worker finishes the run in time.
+    """
+    queue = get_job_queue()
+    job_id = None
+    if idempotency_key is not None:
+        # The fingerprint keeps a key reused for another request apart
+        job_id = request_fingerprint(idempotency_key, fingerprint)
+
+    job_id = queue.enqueue(
+        {
+            "email": request.email,
+            "password": request.password,
+            "headless": request.headless,
+        },
+        job_id=job_id,
+        group=hash_account(request.email),
+        expires_in=settings.job_result_timeout,
+    )
+
+    try:
+        job = queue.wait_for_result(job_id, timeout=settings.job_result_timeout)
+    except JobTimeout as error:
+        queue.cancel(job_id, f"Cancelled: {error}")
+        raise
+
+    if job["status"] != JOB_SUCCEEDED:
+        raise RuntimeError(job["error"])
+
+    return RunBotResponse(**job["result"])
+
 @router.post("/run-bot", response_model=RunBotResponse)
-def run_bot(request: RunBotRequest):
+def run_bot(
+    request: RunBotRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+):
     """
     POST endpoint to trigger the automated purchase bot.
 
@@ -44,37 +165,49 @@ def run_bot(request: RunBotRequest):
     configures the settings, instantiates the BuyBot class, and runs the 
     full purchase flow automation.
 
+    Runs for the same account email are executed one at a time. When an
+    `Idempotency-Key` header is sent, a request with a key that is already
+    running waits for that run instead of starting a new one, and a key that
+    already completed gets the stored result back. Such responses carry the
+    `Idempotent-Replayed: true` header.
+
     Args:
         request (RunBotRequest): Request body containing login credentials and settings.
+        response (Response): Outgoing response, used to set headers.
+        idempotency_key (str, optional): Value of the `Idempotency-Key` header.
 
     Returns:
         RunBotResponse: A success flag and descriptive message.
 
     Raises:
-        HTTPException: If the bot fails during execution, returns a 500 error with detail.
+        HTTPException: 422 if the idempotency key was used for a different
+            request, or 500 if the bot fails during execution.
     """
-    try:
-        # Load default settings and override headless flag from request
-        settings = Settings()
-        settings.headless = request.headless
+    fingerprint = request_fingerprint(
+        request.email.strip().lower(), request.password, request.headless
+    )
 
-        # Instantiate the BuyBot with user-provided credentials and settings
-        bot = BuyBot(
+    try:
+        result, replayed = get_run_coordinator().run(
+            key=idempotency_key,
             email=request.email,
-            password=request.password,
-            headless=request.headless,
-            url=settings.amazon_url
+            fingerprint=fingerprint,
+            action=lambda: _execute_purchase_flow(
+                request, idempotency_key, fingerprint
+            ),
         )
 
-        # Run the automation flow (e.g., login, search, add to cart)
-        bot.run_purchase_flow()
+    except IdempotencyKeyMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-        # Return a success response if no errors occurred
-        return RunBotResponse(success=True, message="Purchase flow completed successfully.")
-    
     except Exception as e:
         # Print full traceback to console for debugging
         traceback.print_exc()
         
         # Return a 500 error response with a detailed message
         raise HTTPException(status_code=500, detail=f"Bot execution failed: {str(e)}")
+
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+
+    return result
@@ -0,0 +1,74 @@
+from typing import Optional
+
+from fastapi import APIRouter, Response
+from pydantic import BaseModel
+
+from api.prewarm import (
+    PREWARM_DISABLED,
+    PREWARM_FAILED,
+    PREWARM_READY,
+    prewarm_status,
+)
+
+# Create a FastAPI router instance for organizing endpoints
+router = APIRouter()
+
+# -------------------- Response Models --------------------
+
+class HealthResponse(BaseModel):
+    """
+    Response model for the health and readiness checks.
+
+    Attributes:
+        status (str): "ok" when the check passes, "starting" otherwise.
+        prewarm (str): Prewarm state (disabled, pending, running, ready or failed).
+        prewarm_ms (float): Prewarm duration in milliseconds, once finished.
+        error (str): Prewarm error, if any.
+    """
+    status: str
+    prewarm: str
+    prewarm_ms: Optional[float] = None
+    error: Optional[str] = None
+
+# -------------------- Endpoint Implementation --------------------
+
+def _health_response(status: str) -> HealthResponse:
+    current = prewarm_status()
+    return HealthResponse(
+        status=status,
+        prewarm=current["state"],
+        prewarm_ms=current["duration_ms"],
+        error=current["error"],
+    )
+
+@router.get("/health", response_model=HealthResponse)
+def health():
+    """
+    GET endpoint for liveness checks. Succeeds as soon as the server runs,
+    even while the browser is still being prewarmed.
+
+    Returns:
+        HealthResponse: Server status and prewarm state.
+    """
+    return _health_response("ok")
+
+@router.get("/ready", response_model=HealthResponse)
+def ready(response: Response):
+    """
+    GET endpoint for readiness checks.
+
+    Returns 503 until prewarming has finished. A failed prewarm does not
+    block readiness, because runs can still launch the browser themselves.
+
+    Args:
+        response (Response): Outgoing response, used to set the status code.
+
+    Returns:
+        HealthResponse: Readiness status and prewarm state.
+    """
+    state = prewarm_status()["state"]
+    if state in (PREWARM_READY, PREWARM_DISABLED, PREWARM_FAILED):
+        return _health_response("ok")
+
+    response.status_code = 503
+    return _health_response("starting")
@@ -0,0 +1,203 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+
+from storage.run_history import MAX_PAGE_SIZE, get_run_history_store
+
+# Create a FastAPI router instance for organizing endpoints
+router = APIRouter()
+
+# Size in seconds of the supported stats buckets
+BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+
+# -------------------- Response Models --------------------
+
+class RunStep(BaseModel):
+    """
+    A single timed step of a run.
+
+    Attributes:
+        step (str): Step name.
+        started_at (datetime): When the step started.
+        duration_ms (float): Step duration in milliseconds.
+        status (str): Step outcome.
+    """
+    step: str
+    started_at: datetime
+    duration_ms: float
+    status: str
+
+class RunRecord(BaseModel):
+    """
+    A stored automation run.
+
+    Attributes:
+        run_id (str): Unique run identifier.
+        account_hash (str): SHA-256 hash of the account email.
+        started_at (datetime): When the run started.
+        ended_at (datetime): When the run ended.
+        duration_ms (float): Total run duration in milliseconds.
+        status (str): Run outcome (success, failed or error).
+        error_step (str): Step where the run failed, if any.
+        error_message (str): Error description, if any.
+        mode (str): Network mode of the run (live, record or replay).
+        steps (list): Timed steps of the run.
+    """
+    run_id: str
+    account_hash: str
+    started_at: datetime
+    ended_at: datetime
+    duration_ms: float
+    status: str
+    error_step: Optional[str] = None
+    error_message: Optional[str] = None
+    mode: str
+    steps: List[RunStep]
+
+class RunListResponse(BaseModel):
+    """
+    A page of runs.
+
+    Attributes:
+        runs (list): Runs on this page, newest first.
+        next_cursor (int): Cursor for the next page, or None on the last page.
+    """
+    runs: List[RunRecord]
+    next_cursor: Optional[int] = None
+
+class DurationSummary(BaseModel):
+    """
+    Duration statistics for a step.
+
+    Attributes:
+        count (int): Number of samples.
+        avg_ms (float): Average duration in milliseconds.
+        p50_ms (float): Median duration in milliseconds.
+        p95_ms (float): 95th percentile duration in milliseconds.
+    """
+    count: int
+    avg_ms: float
+    p50_ms: float
+    p95_ms: float
+
+class BucketSummary(DurationSummary):
+    """
+    Duration statistics for a step within a time bucket.
+
+    Attributes:
+        step (str): Step name.
+        bucket_start (datetime): Start of the time bucket.
+    """
+    step: str
+    bucket_start: datetime
+
+class RunStatsResponse(BaseModel):
+    """
+    Aggregated run statistics.
+
+    Attributes:
+        since (datetime): Start of the aggregated range.
+        until (datetime): End of the aggregated range, or None for now.
+        total_runs (int): Number of runs in the range.
+        avg_run_ms (float): Average run duration in milliseconds.
+        p95_run_ms (float): 95th percentile run duration in milliseconds.
+        by_status (dict): Run count per outcome.
+        failures_by_step (dict): Failed run count per step, most frequent first.
+        steps (dict): Duration statistics per step.
+        buckets (list): Duration statistics per step and time bucket, if requested.
+    """
+    since: datetime
+    until: Optional[datetime] = None
+    total_runs: int
+    avg_run_ms: Optional[float] = None
+    p95_run_ms: Optional[float] = None
+    by_status: Dict[str, int]
+    failures_by_step: Dict[str, int]
+    steps: Dict[str, DurationSummary]
+    buckets: Optional[List[BucketSummary]] = None
+
+# -------------------- Helpers --------------------
+
+def _to_timestamp(value: Optional[datetime]) -> Optional[float]:
+    """
+    Converts an optional datetime to a Unix timestamp, assuming UTC if naive.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+# -------------------- Endpoint Implementation --------------------
+
+@router.get("/runs", response_model=RunListResponse)
+def list_runs(
+    status: Optional[str] = None,
+    error_step: Optional[str] = None,
+    account_hash: Optional[str] = None,
+    mode: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    GET endpoint listing stored runs, newest first.
+
+    Args:
+        status (str): Only runs with this outcome.
+        error_step (str): Only runs that failed at this step.
+        account_hash (str): Only runs for this account hash.
+        mode (str): Only runs in this network mode (live, record or replay).
+        since (datetime): Only runs started at or after this time.
+        until (datetime): Only runs started before this time.
+        cursor (int): `next_cursor` value from the previous page.
+        limit (int): Maximum number of runs per page.
+
+    Returns:
+        RunListResponse: The requested page and the cursor for the next one.
+    """
+    runs, next_cursor = get_run_history_store().list_runs(
+        status=status,
+        error_step=error_step,
+        account_hash=account_hash,
+        mode=mode,
+        since=_to_timestamp(since),
+        until=_to_timestamp(until),
+        cursor=cursor,
+        limit=limit,
+    )
+    return RunListResponse(runs=runs, next_cursor=next_cursor)
+
+@router.get("/runs/stats", response_model=RunStatsResponse)
+def run_stats(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    step: Optional[str] = None,
+    mode: Optional[str] = None,
+    bucket: Optional[Literal["hour", "day"]] = None,
+):
+    """
+    GET endpoint returning aggregate statistics over stored runs.
+
+    Args:
+        since (datetime): Only runs started at or after this time. Defaults
+            to 7 days before `until` (or now).
+        until (datetime): Only runs started before this time.
+        step (str): Only report durations for this step.
+        mode (str): Only runs in this network mode. Comparing "live" and
+            "replay" shows how much faster replayed runs are.
+        bucket (str): Also group step durations by "hour" or "day".
+
+    Returns:
+        RunStatsResponse: Outcome counts, failing steps and duration percentiles.
+    """
+    return get_run_history_store().stats(
+        since=_to_timestamp(since),
+        until=_to_timestamp(until),
+        step=step,
+        mode=mode,
+        bucket_seconds=BUCKET_SECONDS.get(bucket),
+    )
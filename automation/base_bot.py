@@ -1,5 +1,130 @@
+import json
+import os
 import tempfile
+import threading
+import uuid
+from urllib.parse import parse_qs
 from playwright.sync_api import sync_playwright
+from config.logs.logger_config import logger
+
+# Network modes supported by BaseBot
+HAR_MODE_LIVE = "live"
+HAR_MODE_RECORD = "record"
+HAR_MODE_REPLAY = "replay"
+HAR_MODES = (HAR_MODE_LIVE, HAR_MODE_RECORD, HAR_MODE_REPLAY)
+
+# Only one run per process may record a HAR at a time
+_har_record_lock = threading.Lock()
+
+# Headers removed from recorded HARs, they carry the session
+HAR_SECRET_HEADERS = ("authorization", "cookie", "set-cookie")
+
+# Request bodies posting a field named like one of these are not recorded
+HAR_SECRET_FIELDS = ("password", "email")
+
+# Chromium arguments that skip work the automation does not need
+FAST_LAUNCH_ARGS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-gpu",
+    "--no-first-run",
+    "--mute-audio",
+]
+
+# Named sets of extra Chromium launch arguments
+LAUNCH_PROFILES = {
+    # Chromium defaults
+    "default": [],
+    # Faster launches with fewer background services
+    "fast": FAST_LAUNCH_ARGS,
+    # "fast" plus settings for containers and CI machines
+    "ci": FAST_LAUNCH_ARGS + ["--disable-dev-shm-usage", "--no-sandbox"],
+}
+DEFAULT_LAUNCH_PROFILE = "default"
+
+
+def get_launch_args(launch_profile: str) -> list:
+    """
+    Returns the Chromium arguments of a launch profile.
+
+    Args:
+        launch_profile (str): Profile name (see LAUNCH_PROFILES).
+
+    Returns:
+        list: Extra command-line arguments for Chromium.
+
+    Raises:
+        ValueError: If the profile is unknown.
+    """
+    if launch_profile not in LAUNCH_PROFILES:
+        raise ValueError(
+            f"Unknown launch profile {launch_profile!r}. "
+            f"Expected one of {tuple(LAUNCH_PROFILES)}."
+        )
+    return list(LAUNCH_PROFILES[launch_profile])
+
+
+def scrub_har(har_path: str) -> None:
+    """
+    Removes session cookies and login credentials from a HAR file in place.
+
+    Cookie, Set-Cookie and Authorization headers are dropped, as are the
+    parsed cookie lists. Request bodies that post a password or email
+    field are dropped too. Replay still serves those requests, because
+    Playwright matches a recorded POST without a body on its URL and
+    method, and breaks ties on the remaining headers.
+
+    Args:
+        har_path (str): HAR file to scrub.
+    """
+    with open(har_path, encoding="utf-8") as har_file:
+        har = json.load(har_file)
+
+    for entry in har["log"]["entries"]:
+        for message in (entry["request"], entry["response"]):
+            message["headers"] = [
+                header
+                for header in message.get("headers", [])
+                if header["name"].lower() not in HAR_SECRET_HEADERS
+            ]
+            if "cookies" in message:
+                message["cookies"] = []
+
+        post_data = entry["request"].get("postData")
+        if post_data and _posts_secret_field(post_data):
+            del entry["request"]["postData"]
+
+    with open(har_path, "w", encoding="utf-8") as har_file:
+        json.dump(har, har_file)
+
+
+def _posts_secret_field(post_data: dict) -> bool:
+    """
+    Tells whether a recorded request body posts a credential field.
+
+    Args:
+        post_data (dict): HAR `postData` of a request.
+
+    Returns:
+        bool: True if any form or JSON field name looks like a credential.
+    """
+    names = {param["name"] for param in post_data.get("params", [])}
+    text = post_data.get("text") or ""
+    names.update(parse_qs(text))
+    try:
+        body = json.loads(text)
+    except ValueError:
+        body = None
+    if isinstance(body, dict):
+        names.update(body)
+
+    return any(
+        field in name.lower() for name in names for field in HAR_SECRET_FIELDS
+    )
 
 
 class BaseBot:
@@ -7,24 +132,74 @@ class BaseBot:
     Base class that manages the Playwright browser lifecycle.
 
     This class uses a persistent browser context created in a temporary
-    directory to ensure session isolation across runs. It can be used
-    with a `with` statement to automatically handle setup and teardown.
+    directory to ensure session isolation across runs. When an already
+    running browser is passed in (see BrowserPool), a fresh context is
+    opened on it instead, which is just as isolated and skips launching
+    Chromium. It can be used with a `with` statement to automatically
+    handle setup and teardown.
+
+    The network can optionally be recorded to or replayed from a HAR file:
+    - "live": Regular network access (default).
+    - "record": Network access, every response is saved to the HAR file
+      when the browser closes. The recording is written to a private file
+      and moved into place at the end, so the HAR always holds one
+      complete run. Concurrent record runs in one process are refused.
+      Cookies and login credentials are scrubbed before the file is
+      published (see scrub_har), and it is only readable by its owner.
+      Response bodies stay as served, so treat the HAR as private data.
+    - "replay": Every request is served from the HAR file. Requests that
+      are not in the file are aborted, so the run never touches the network.
 
     Attributes:
         headless (bool): Whether the browser should run in headless mode.
-        temp_profile (str): Path to the temporary browser user data directory.
-        browser: Playwright persistent browser context.
+        har_mode (str): Network mode (live, record or replay).
+        har_path (str): Path to the HAR file used to record or replay.
+        temp_profile (str): Path to the temporary browser user data directory,
+            or None when running in a shared browser.
+        browser: Playwright browser context used by the run.
         page: Active page used for automation.
     """
 
-    def __init__(self, headless):
+    def __init__(
+        self,
+        headless,
+        har_mode=HAR_MODE_LIVE,
+        har_path=None,
+        launch_profile=DEFAULT_LAUNCH_PROFILE,
+        shared_browser=None,
+    ):
         """
-        Initializes the BaseBot with the headless setting.
+        Initializes the BaseBot with the headless and network settings.
 
         Args:
             headless (bool): Whether the browser should run headlessly.
+            har_mode (str, optional): Network mode (live, record or replay).
+            har_path (str, optional): HAR file to record to or replay from.
+                Required unless the mode is "live".
+            launch_profile (str, optional): Chromium launch-argument profile.
+                Defaults to "default".
+            shared_browser (Browser, optional): Running browser to open the
+                context in. It must belong to the current thread, and its own
+                headless mode and launch profile apply.
+
+        Raises:
+            ValueError: If the mode or launch profile is unknown, the HAR path
+                is missing or the HAR file to replay does not exist.
         """
+        if har_mode not in HAR_MODES:
+            raise ValueError(
+                f"Unknown HAR mode {har_mode!r}. Expected one of {HAR_MODES}."
+            )
+        if har_mode != HAR_MODE_LIVE and not har_path:
+            raise ValueError(f"A HAR path is required in {har_mode!r} mode.")
+        if har_mode == HAR_MODE_REPLAY and not os.path.exists(har_path):
+            raise ValueError(f"HAR file to replay not found: {har_path}")
+
         self.headless = headless
+        self.har_mode = har_mode
+        self.har_path = har_path
+        self.launch_args = get_launch_args(launch_profile)
+        self.shared_browser = shared_browser
 
     def __enter__(self):
         """
@@ -32,27 +207,73 @@ class BaseBot:
 
         Returns:
             BaseBot: The current instance with initialized browser and page.
+
+        Raises:
+            RuntimeError: If another run in this process is already recording.
+        """
+        self._recording_path = None
+        if self.har_mode == HAR_MODE_RECORD:
+            if not _har_record_lock.acquire(blocking=False):
+                raise RuntimeError(
+                    "Another run is already recording a HAR. "
+                    "Record runs must not overlap."
+                )
+            # Each recording gets its own file until it is complete
+            root, extension = os.path.splitext(self.har_path)
+            self._recording_path = (
+                f"{root}.{uuid.uuid4().hex}.recording{extension or '.har'}"
+            )
+
+        try:
+            self._launch()
+        except Exception:
+            self._release_recording(keep=False)
+            raise
+
+        return self
+
+    def _launch(self) -> None:
+        """
+        Starts Playwright, launches the browser context and opens the page.
         """
-        # Start Playwright
-        self.p = sync_playwright().start()
-
-        # Create a temporary user data directory for browser session
-        self.temp_profile = tempfile.mkdtemp()
-
-        # Launch browser with persistent context using the temporary profile
-        self.browser = self.p.chromium.launch_persistent_context(
-            user_data_dir=self.temp_profile,
-            headless=self.headless,
-            viewport={"width": 1280, "height": 800},
-            user_agent=(
+        context_options = {
+            "viewport": {"width": 1280, "height": 800},
+            "user_agent": (
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
                 "AppleWebKit/537.36 (KHTML, like Gecko) "
                 "Chrome/115.0.0.0 Safari/537.36"
             ),
-            extra_http_headers={
+            "extra_http_headers": {
                 "Accept-Language": "es-MX,es;q=0.9",  # Simulate Mexican locale
-            }
-        )
+            },
+            # Service workers would bypass HAR routing
+            "service_workers": (
+                "block" if self.har_mode != HAR_MODE_LIVE else "allow"
+            ),
+        }
+
+        if self.shared_browser is not None:
+            # A new context in the running browser starts with no session
+            self.p = None
+            self.temp_profile = None
+            self.browser = self.shared_browser.new_context(**context_options)
+        else:
+            # Start Playwright
+            self.p = sync_playwright().start()
+
+            # Create a temporary user data directory for browser session
+            self.temp_profile = tempfile.mkdtemp()
+
+            # Launch browser with persistent context using the temporary profile
+            self.browser = self.p.chromium.launch_persistent_context(
+                user_data_dir=self.temp_profile,
+                headless=self.headless,
+                args=self.launch_args,
+                **context_options,
+            )
+
+        # Record or replay the network through the HAR file
+        self._setup_har()
 
         # Use existing page if available; otherwise create a new one
         self.page = (
@@ -61,16 +282,71 @@ class BaseBot:
             else self.browser.new_page()
         )
 
-        return self
+    def _setup_har(self) -> None:
+        """
+        Routes the browser context through the HAR file for the current mode.
+        """
+        if self.har_mode == HAR_MODE_RECORD:
+            har_dir = os.path.dirname(self.har_path)
+            if har_dir:
+                os.makedirs(har_dir, exist_ok=True)
+
+            # The HAR file is written when the context is closed
+            self.browser.route_from_har(
+                self._recording_path,
+                update=True,
+                update_content="embed",
+                update_mode="full",
+            )
+            logger.info(
+                f"Recording network to HAR: {self.har_path} "
+                f"(via {self._recording_path})"
+            )
+
+        elif self.har_mode == HAR_MODE_REPLAY:
+            # Unknown requests are aborted instead of reaching the network
+            self.browser.route_from_har(self.har_path, not_found="abort")
+            logger.info(f"Replaying network from HAR: {self.har_path}")
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
-        Closes the browser and stops the Playwright instance upon exit.
+        Closes the browser context, and the browser and Playwright instance
+        if this bot started them.
 
         Args:
             exc_type: Exception type (if any).
             exc_val: Exception value (if any).
             exc_tb: Traceback (if any).
         """
-        self.browser.close()
-        self.p.stop()
+        try:
+            self.browser.close()
+            if self.p is not None:
+                self.p.stop()
+        finally:
+            self._release_recording(keep=True)
+
+    def _release_recording(self, keep: bool) -> None:
+        """
+        Finishes a record run: publishes or discards the recording and
+        releases the record lock.
+
+        Args:
+            keep (bool): Move the recording to the HAR path if True,
+                delete it otherwise.
+        """
+        if self._recording_path is None:
+            return
+
+        try:
+            if os.path.exists(self._recording_path):
+                if keep:
+                    scrub_har(self._recording_path)
+                    os.chmod(self._recording_path, 0o600)
+                    # Atomic, so readers never see a partially written HAR
+                    os.replace(self._recording_path, self.har_path)
+                    logger.info(f"HAR recording saved to {self.har_path}")
+                else:
+                    os.remove(self._recording_path)
+        finally:
+            self._recording_path = None
+            _har_record_lock.release()
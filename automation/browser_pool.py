@@ -0,0 +1,266 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+from config.logs.logger_config import logger
+from config.settings import get_settings
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium browsers, each owned by a dedicated thread.
+
+    Playwright's sync objects can only be used from the thread that created
+    them, so each pool thread starts Playwright, launches one browser and
+    then runs the actions dispatched to it. Runs get a fresh browser
+    context instead of a fresh browser, which skips starting the driver
+    and launching Chromium on every run.
+
+    Threads are started on demand, one per concurrent run up to `size`
+    per headless mode; further runs wait for a free thread. A browser
+    that crashed or disconnected is relaunched before the next run.
+
+    Attributes:
+        size (int): Maximum number of browsers per headless mode.
+        launch_profile (str): Chromium launch-argument profile.
+    """
+
+    def __init__(self, size: int, launch_profile: str):
+        """
+        Initializes an empty pool. No browser is launched yet.
+
+        Args:
+            size (int): Maximum number of browsers per headless mode.
+            launch_profile (str): Chromium launch-argument profile.
+        """
+        self.size = size
+        self.launch_profile = launch_profile
+        self._lock = threading.Lock()
+        self._groups = {}
+        self._closed = False
+
+    def run(self, action, headless: bool = True):
+        """
+        Runs an action on a pool thread and waits for it.
+
+        Args:
+            action (Callable[[Browser], Any]): Receives the thread's browser.
+            headless (bool, optional): Browser mode to run in. Defaults to True.
+
+        Returns:
+            Any: The action result.
+
+        Raises:
+            RuntimeError: If the pool is closed.
+            Exception: Whatever the action, or launching the browser, raised.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The browser pool is closed.")
+            group = self._group(headless)
+            # Reserve a free browser, start a new one, or wait for one
+            if group["free"] > 0:
+                group["free"] -= 1
+            elif len(group["threads"]) < self.size:
+                self._spawn(headless, group)
+            else:
+                group["waiting"] += 1
+            group["tasks"].put((action, future))
+        return future.result()
+
+    def prewarm(self, headless: bool = True) -> None:
+        """
+        Starts one browser, if none is running yet, and waits for its launch.
+
+        Args:
+            headless (bool, optional): Browser mode to start. Defaults to True.
+
+        Raises:
+            Exception: Whatever launching the browser raised. The thread
+                stays up and tries again on the next run.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The browser pool is closed.")
+            group = self._group(headless)
+            if not group["threads"]:
+                self._spawn(headless, group)
+                group["free"] += 1
+            ready = group["threads"][0]["ready"]
+        ready.result()
+
+    def close(self, timeout: float = 30) -> None:
+        """
+        Closes every browser and stops the pool threads.
+
+        Runs already dispatched finish first.
+
+        Args:
+            timeout (float, optional): Seconds to wait for each thread.
+        """
+        with self._lock:
+            self._closed = True
+            threads = []
+            for group in self._groups.values():
+                for entry in group["threads"]:
+                    group["tasks"].put(None)
+                    threads.append(entry["thread"])
+        for thread in threads:
+            thread.join(timeout)
+
+    def _group(self, headless: bool) -> dict:
+        """
+        Returns the task queue and threads of a headless mode.
+
+        `free` counts threads not reserved by any run, `waiting` counts
+        runs queued while every thread was reserved. Both are updated
+        under the pool lock before a caller is woken, so a run dispatched
+        right after another one finishes reuses its browser.
+
+        Must be called with the pool lock held.
+        """
+        return self._groups.setdefault(
+            headless,
+            {"tasks": queue.Queue(), "threads": [], "free": 0, "waiting": 0},
+        )
+
+    def _spawn(self, headless: bool, group: dict) -> None:
+        """
+        Starts a browser thread. Must be called with the pool lock held.
+
+        The new thread is not counted as free; the caller either reserves
+        it for its run or marks it free.
+        """
+        ready = Future()
+        mode = "headless" if headless else "headed"
+        thread = threading.Thread(
+            target=self._serve,
+            args=(headless, group, ready),
+            name=f"browser-{mode}-{len(group['threads'])}",
+            daemon=True,
+        )
+        group["threads"].append({"thread": thread, "ready": ready})
+        thread.start()
+
+    def _serve(self, headless: bool, group: dict, ready: Future) -> None:
+        """
+        Pool thread body: owns Playwright and one browser, runs actions.
+        """
+        playwright = None
+        browser = None
+
+        def launch():
+            nonlocal playwright, browser
+            # Imported here so the API can import the pool without Playwright
+            from playwright.sync_api import sync_playwright
+
+            from automation.base_bot import get_launch_args
+
+            if browser is not None:
+                try:
+                    browser.close()
+                except Exception:
+                    pass
+            if playwright is None:
+                playwright = sync_playwright().start()
+            browser = playwright.chromium.launch(
+                headless=headless, args=get_launch_args(self.launch_profile)
+            )
+            logger.info(f"{threading.current_thread().name} launched Chromium")
+
+        try:
+            try:
+                launch()
+            except Exception as error:
+                logger.warning(f"Browser launch failed: {error}")
+                ready.set_exception(error)
+            else:
+                ready.set_result(None)
+
+            while True:
+                task = group["tasks"].get()
+                if task is None:
+                    return
+
+                action, future = task
+                try:
+                    if browser is None or not browser.is_connected():
+                        launch()
+                    result = action(browser)
+                except Exception as error:
+                    outcome = (future.set_exception, error)
+                else:
+                    outcome = (future.set_result, result)
+
+                # Free this thread before the caller can dispatch again
+                with self._lock:
+                    if group["waiting"] > 0:
+                        group["waiting"] -= 1
+                    else:
+                        group["free"] += 1
+                outcome[0](outcome[1])
+        finally:
+            try:
+                if browser is not None:
+                    browser.close()
+            finally:
+                if playwright is not None:
+                    playwright.stop()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """
+    Returns the process-wide browser pool, creating it on first use.
+
+    Returns:
+        BrowserPool | None: Shared pool, or None when `browser_pool_size`
+        is 0 and every run launches its own browser.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                settings = get_settings()
+                if settings.browser_pool_size <= 0:
+                    return None
+                _pool = BrowserPool(
+                    size=settings.browser_pool_size,
+                    launch_profile=settings.launch_profile,
+                )
+    return _pool
+
+
+def run_in_browser(action, headless: bool = True):
+    """
+    Runs an action in a browser from the process-wide pool.
+
+    Without a pool, the action runs on the calling thread and receives
+    None, so it launches its own browser.
+
+    Args:
+        action (Callable[[Browser | None], Any]): Receives the browser to use.
+        headless (bool, optional): Browser mode to run in. Defaults to True.
+
+    Returns:
+        Any: The action result.
+    """
+    pool = get_browser_pool()
+    if pool is None:
+        return action(None)
+    return pool.run(action, headless=headless)
+
+
+def close_browser_pool() -> None:
+    """
+    Closes the process-wide browser pool, if it was created.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
@@ -11,7 +11,24 @@ SELECTORS_AMAZON = {
     "hamburger_menu": "#nav-hamburger-menu",
     "hamburger_option_template": "a.hmenu-item",
     "hamburger_items_scope": "#hmenu-content a.hmenu-item",
+    "product_listing_item": "li.octopus-pc-item",
     "add_to_cart": "#add-to-cart-button",
+    "warranty_popup": "#attach-warranty-pane",
+    "nav_cart_count": "#nav-cart-count",
     "nav_cart": "#nav-cart",
     "buy_now": "input[name='proceedToRetailCheckout']",
 }
+
+# Visible texts and URL fragments used to detect page states
+TEXTS_AMAZON = {
+    "added_to_cart": "Agregado al carrito",
+}
+
+URL_PATTERNS_AMAZON = {
+    "added_to_cart": r"/cart/(smart-wagon|add-to-cart)|/huc/",
+}
+
+# Paths relative to the Amazon base URL
+URL_PATHS_AMAZON = {
+    "cart": "/gp/cart/view.html",
+}
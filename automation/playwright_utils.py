@@ -1,12 +1,32 @@
+from automation.playwright_constants import (
+    SELECTORS_AMAZON,
+    TEXTS_AMAZON,
+    URL_PATTERNS_AMAZON,
+)
 from config.logs.logger_config import logger
 from functools import wraps
 from playwright.sync_api import TimeoutError
+import re
+import time
 import unicodedata
 from functools import wraps
 
 # Constant for locating all potential clickable HTML elements
 ALL_CLICKABLE_ELEMENTS = "button, a, span, div"
 
+# Interval between condition checks in wait_for_any (milliseconds)
+WAIT_FOR_ANY_POLL_INTERVAL = 100
+
+# Time a prefetched tab gets to show its ready element before a reload
+PREFETCH_READY_TIMEOUT = 2000
+
+# URLs resolved by earlier flows, keyed by navigation target. The store is
+# process-wide: every PlaywrightUtils instance and every run in the process
+# (including concurrent runs on browser pool threads) reads and writes it,
+# so later runs can prefetch pages found by earlier ones. It is not
+# persisted and starts empty in each process.
+_resolved_urls = {}
+
 
 def log_step(func):
     @wraps(func)
@@ -40,6 +60,8 @@ class PlaywrightUtils:
 
     Attributes:
         page: A Playwright page object for performing browser interactions.
+        tab_budget (int): Maximum number of speculative tabs open at once.
+            0 disables prefetching.
 
     Example:
         utils = PlaywrightUtils(page)
@@ -48,14 +70,18 @@ class PlaywrightUtils:
         utils.wait_for_clickable_and_click("#submit")
     """
 
-    def __init__(self, page):
+    def __init__(self, page, tab_budget=0):
         """
         Initializes the PlaywrightUtils class.
 
         Args:
             page: The Playwright page object to use for interactions.
+            tab_budget (int, optional): Maximum number of speculative tabs.
+                Defaults to 0 (prefetching disabled).
         """
         self.page = page
+        self.tab_budget = tab_budget
+        self._prefetched = {}
 
     # --------------------- Navigation ---------------------
 
@@ -79,18 +105,198 @@ class PlaywrightUtils:
             logger.error(f"Failed to navigate to {url}: {error}")
             raise
 
+    # --------------------- Speculative tabs ---------------------
+
+    def remember_url(self, key: str) -> None:
+        """
+        Stores the current URL so later flows can prefetch it.
+
+        The URL goes to the process-wide store shared by every run, so only
+        call this once the page is known to be the right one.
+
+        Args:
+            key (str): Name of the navigation target.
+        """
+        _resolved_urls[key] = self.page.url
+        logger.debug(f"Resolved {key!r} to {self.page.url}")
+
+    def resolved_url(self, key: str):
+        """
+        Returns a URL stored with remember_url.
+
+        Args:
+            key (str): Name of the navigation target.
+
+        Returns:
+            str | None: The stored URL, or None if it was never resolved.
+        """
+        return _resolved_urls.get(key)
+
+    @safe_action(default=False)
+    def prefetch(self, key: str, url: str) -> bool:
+        """
+        Starts loading a URL in a spare tab of the same browser context.
+
+        The navigation is started without waiting for it, so the main page
+        keeps being driven while the tab loads in the background. The tab
+        is handed over later with take_prefetched.
+
+        Args:
+            key (str): Name used to claim the tab later.
+            url (str): URL to load.
+
+        Returns:
+            bool: True if the tab is loading, False if prefetching is disabled
+            or the tab budget is exhausted.
+        """
+        if key in self._prefetched:
+            return True
+
+        if len(self._prefetched) >= self.tab_budget:
+            logger.debug(f"Tab budget reached, not prefetching {key!r}")
+            return False
+
+        tab = self.page.context.new_page()
+        entry = {"tab": tab, "url": url, "response": None}
+        self._prefetched[key] = entry
+
+        # Keep the main document response to validate the tab on handover
+        def on_response(response):
+            if (
+                response.request.is_navigation_request()
+                and response.frame == tab.main_frame
+            ):
+                entry["response"] = response
+
+        tab.on("response", on_response)
+
+        # Assigning the location returns immediately, unlike goto()
+        tab.evaluate("(url) => { window.location.href = url; }", url)
+        self.page.bring_to_front()
+
+        logger.info(f"Prefetching {key!r} in a background tab: {url}")
+        return True
+
+    @safe_action(default=False)
+    def take_prefetched(
+        self, key: str, ready_selector: str = None, timeout=10000
+    ) -> bool:
+        """
+        Switches the main page to a prefetched tab and closes the old page.
+
+        The tab is only used if its main document loaded with a successful
+        response. Failed navigations (network errors, requests aborted in
+        HAR replay) end on an error page and are rejected.
+
+        Args:
+            key (str): Name given to prefetch.
+            ready_selector (str, optional): Element that must become visible
+                for the tab to be usable. If it does not show up shortly, the
+                tab is reloaded once.
+            timeout (int): Timeout in milliseconds.
+
+        Returns:
+            bool: True if the tab was handed over, False if there was none or
+            it could not be used. In that case the main page is unchanged.
+        """
+        entry = self._prefetched.pop(key, None)
+        if entry is None:
+            return False
+
+        tab = entry["tab"]
+        try:
+            # Wait for the navigation to leave about:blank and finish loading
+            tab.wait_for_url(lambda url: url != "about:blank", timeout=timeout)
+            tab.wait_for_load_state("domcontentloaded", timeout=timeout)
+
+            response = entry["response"]
+            if (
+                response is None
+                or not response.ok
+                or tab.url.startswith("chrome-error://")
+            ):
+                status = response.status if response else "no response"
+                logger.warning(
+                    f"Prefetched {key!r} failed to load ({status}): {tab.url}"
+                )
+                tab.close()
+                return False
+
+            if ready_selector and not self._wait_visible(
+                tab, ready_selector, PREFETCH_READY_TIMEOUT
+            ):
+                # The page was loaded too early, refresh it once
+                logger.info(f"Prefetched {key!r} is stale, reloading it")
+                response = tab.reload(
+                    wait_until="domcontentloaded", timeout=timeout
+                )
+                if response is None or not response.ok:
+                    logger.warning(f"Reload of prefetched {key!r} failed")
+                    tab.close()
+                    return False
+                tab.locator(ready_selector).first.wait_for(
+                    state="visible", timeout=timeout
+                )
+
+        except Exception:
+            tab.close()
+            raise
+
+        previous = self.page
+        self.page = tab
+        tab.bring_to_front()
+        previous.close()
+
+        logger.info(f"Switched to prefetched {key!r}: {tab.url}")
+        return True
+
+    @staticmethod
+    def _wait_visible(page, selector: str, timeout: int) -> bool:
+        """
+        Waits briefly for an element to become visible.
+
+        Args:
+            page: Page to look in.
+            selector (str): CSS selector of the element.
+            timeout (int): Timeout in milliseconds.
+
+        Returns:
+            bool: True if the element became visible in time.
+        """
+        try:
+            page.locator(selector).first.wait_for(
+                state="visible", timeout=timeout
+            )
+            return True
+        except TimeoutError:
+            return False
+
+    def discard_prefetched(self) -> None:
+        """
+        Closes every prefetched tab that was not handed over.
+        """
+        for key, entry in self._prefetched.items():
+            try:
+                entry["tab"].close()
+            except Exception as error:
+                logger.warning(f"Could not close prefetched {key!r}: {error}")
+        self._prefetched.clear()
+
     # --------------------- Element interaction ---------------------
 
     @log_step
     def wait_for_clickable_and_click(
         self, selector: str, timeout=10000
-    ) -> None:
+    ) -> bool:
         """
         Waits until the specified element is attached, visible, and enabled, then clicks it.
 
         Args:
             selector (str): CSS selector of the element to click.
             timeout (int): Time to wait before timeout (milliseconds).
+
+        Returns:
+            bool: True if the element was clicked, False otherwise.
         """
 
         logger.debug(f"Waiting for element {selector!r} to be clickable...")
@@ -113,6 +319,7 @@ class PlaywrightUtils:
             if locator.is_enabled():
                 locator.click()
                 logger.info(f"Clicked on {selector}")
+                return True
             else:
                 logger.warning(f"{selector} is visible but not enabled.")
                 raise RuntimeError(f"Element {selector} is not enabled for clicking.")
@@ -120,6 +327,7 @@ class PlaywrightUtils:
         except Exception as error:
             # Log any errors encountered while trying to interact with the element
             logger.error(f"Failed to click '{selector}': {error}")
+            return False
 
     @log_step
     @safe_action(default=False)
@@ -187,6 +395,8 @@ class PlaywrightUtils:
             locator.first.click(timeout=timeout, force=True)
             logger.info(f'Forced click succeeded for "{label}"')
 
+        return True
+
     @log_step
     @safe_action(default=False)
     def click_text_block_by_label(self, label: str, timeout=5000) -> bool:
@@ -228,7 +438,7 @@ class PlaywrightUtils:
         """
 
         # Define the selector for product items (carousel or grid)
-        selector = "li.octopus-pc-item"
+        selector = SELECTORS_AMAZON["product_listing_item"]
         first_product = self.page.locator(selector).first
 
         # If the product is not immediately visible, scroll to top and bring it into view
@@ -253,6 +463,10 @@ class PlaywrightUtils:
         """
         Confirms if an item has been added to the shopping cart.
 
+        The cart count badge, the confirmation message and the
+        "added to cart" URL are awaited at the same time, so the check
+        returns as soon as any of them is satisfied.
+
         Args:
             timeout (int): Timeout in milliseconds.
 
@@ -260,26 +474,138 @@ class PlaywrightUtils:
             bool: True if the cart contains items, False otherwise.
         """
 
-        # Strategy 1: Check the cart item count badge
-        cart_count = self.page.locator("#nav-cart-count")
-        if cart_count.is_visible(timeout=timeout):
-            count_text = cart_count.inner_text().strip()
-            if count_text.isdigit() and int(count_text) > 0:
-                logger.info(
-                    f"Product added to cart. Cart count: {count_text}"
-                )
-                return True
+        matched = self.wait_for_any(
+            {
+                # Badge showing a non-zero number of items
+                "cart_count": {
+                    "selector": SELECTORS_AMAZON["nav_cart_count"],
+                    "has_text": re.compile(r"^\s*[1-9]\d*\s*$"),
+                },
+                "success_message": {"text": TEXTS_AMAZON["added_to_cart"]},
+                "cart_url": {
+                    "url": re.compile(URL_PATTERNS_AMAZON["added_to_cart"])
+                },
+            },
+            timeout=timeout,
+        )
 
-        # Strategy 2: Check for a confirmation message
-        success_msg = self.page.locator('text="Agregado al carrito"')
-        if success_msg.is_visible(timeout=timeout):
-            logger.info("Product added to cart - success message found.")
+        if matched == "cart_count":
+            count_text = (
+                self.page.locator(SELECTORS_AMAZON["nav_cart_count"])
+                .inner_text()
+                .strip()
+            )
+            logger.info(f"Product added to cart. Cart count: {count_text}")
             return True
 
-        # Neither method confirmed the product was added
+        if matched:
+            logger.info(f"Product added to cart - {matched} found.")
+            return True
+
+        # No condition confirmed the product was added
         logger.warning("Could not confirm product was added to cart.")
         return False
 
+    # --------------------- Waiting ---------------------
+
+    def wait_for_any(
+        self,
+        conditions: dict,
+        timeout=5000,
+        poll_interval=WAIT_FOR_ANY_POLL_INTERVAL,
+    ):
+        """
+        Waits for several conditions at once and returns the first one met.
+
+        Each condition is a dict with exactly one of the following keys:
+            - "selector": CSS selector of an element that must be visible.
+              An optional "has_text" (str or compiled regex) narrows it down.
+            - "text": Exact visible text that must appear on the page.
+            - "url": Substring or compiled regex the current URL must match.
+
+        Conditions are evaluated in insertion order on every poll, so the
+        earlier entries win when several are satisfied at the same time.
+
+        Args:
+            conditions (dict): Mapping of condition names to condition specs.
+            timeout (int): Maximum time to wait in milliseconds.
+            poll_interval (int): Time between checks in milliseconds.
+
+        Returns:
+            str | None: Name of the first satisfied condition, or None if
+            none was met before the timeout.
+
+        Raises:
+            ValueError: If a condition does not define a supported key.
+            Error: Playwright errors are left to the caller to handle.
+
+        Example:
+            utils.wait_for_any(
+                {
+                    "popup": {"selector": "#attach-warranty-pane"},
+                    "added": {"text": "Agregado al carrito"},
+                },
+                timeout=3000,
+            )
+        """
+        checks = {
+            name: self._build_condition_check(condition)
+            for name, condition in conditions.items()
+        }
+
+        started = time.monotonic()
+        deadline = started + timeout / 1000
+
+        while True:
+            for name, check in checks.items():
+                if check():
+                    elapsed = (time.monotonic() - started) * 1000
+                    logger.debug(
+                        f"wait_for_any: {name!r} met after {elapsed:.0f} ms"
+                    )
+                    return name
+
+            if time.monotonic() >= deadline:
+                break
+
+            self.page.wait_for_timeout(poll_interval)
+
+        logger.debug(
+            f"wait_for_any: none of {list(checks)} met within {timeout} ms"
+        )
+        return None
+
+    def _build_condition_check(self, condition: dict):
+        """
+        Builds a non-blocking check function for a wait_for_any condition.
+
+        Args:
+            condition (dict): Condition spec with a "selector", "text" or "url" key.
+
+        Returns:
+            Callable[[], bool]: Function returning True when the condition is met.
+
+        Raises:
+            ValueError: If the condition does not define a supported key.
+        """
+        if "selector" in condition:
+            locator = self.page.locator(condition["selector"])
+            if condition.get("has_text") is not None:
+                locator = locator.filter(has_text=condition["has_text"])
+            return lambda: locator.first.is_visible()
+
+        if "text" in condition:
+            locator = self.page.get_by_text(condition["text"], exact=True)
+            return lambda: locator.first.is_visible()
+
+        if "url" in condition:
+            pattern = condition["url"]
+            if isinstance(pattern, re.Pattern):
+                return lambda: bool(pattern.search(self.page.url))
+            return lambda: pattern in self.page.url
+
+        raise ValueError(f"Unsupported wait_for_any condition: {condition!r}")
+
  # --------------------- Auth and validation ---------------------
 
     @log_step
@@ -392,23 +718,37 @@ class PlaywrightUtils:
         """
         Attempts to close the warranty offer popup by clicking outside of its bounds.
 
+        The popup is raced against the "added to cart" signals, so when the
+        product is added without an offer the wait ends right away instead
+        of running out the full timeout.
+
         Args:
             timeout (int): Timeout in milliseconds.
 
         Returns:
             bool: True if the popup was closed, False otherwise.
         """
-        popup_selector = "#attach-warranty-pane"
-
-
-        # Locate the popup element
-        popup = self.page.locator(popup_selector)
+        popup_selector = SELECTORS_AMAZON["warranty_popup"]
+
+        matched = self.wait_for_any(
+            {
+                "popup": {"selector": popup_selector},
+                "success_message": {"text": TEXTS_AMAZON["added_to_cart"]},
+                "cart_url": {
+                    "url": re.compile(URL_PATTERNS_AMAZON["added_to_cart"])
+                },
+            },
+            timeout=timeout,
+        )
 
         # If popup is not visible, nothing to close
-        if not popup.is_visible(timeout=timeout):
+        if matched != "popup":
             logger.info("Warranty popup not visible.")
             return False
 
+        # Locate the popup element
+        popup = self.page.locator(popup_selector)
+
         # Get position and dimensions of the popup
         box = popup.bounding_box()
         if not box:
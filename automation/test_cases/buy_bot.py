@@ -1,9 +1,11 @@
-from automation.base_bot import BaseBot
+from automation.base_bot import DEFAULT_LAUNCH_PROFILE, HAR_MODE_LIVE, BaseBot
 from automation.playwright_utils import PlaywrightUtils
-from automation.playwright_constants import SELECTORS_AMAZON
+from automation.playwright_constants import SELECTORS_AMAZON, URL_PATHS_AMAZON
 from config.settings import Settings
 from config.logs.logger_config import logger
+from storage.run_history import RunRecorder, get_run_history_store
 from playwright.sync_api import Page
+from urllib.parse import urljoin
 
 
 class BuyBot:
@@ -23,9 +25,24 @@ class BuyBot:
         password (str): Amazon account password.
         headless (bool): Whether to run the browser in headless mode.
         url (str): URL to open (e.g., Amazon homepage).
+        har_mode (str): Network mode (live, record or replay).
+        har_path (str): HAR file used to record or replay the flow.
+        pipeline_tabs (int): Maximum number of speculative tabs used to
+            prefetch upcoming pages. 0 runs every step on a single tab.
+        launch_profile (str): Name of the Chromium launch-argument profile.
     """
 
-    def __init__(self, email: str, password: str, headless=True, url=None):
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        headless=True,
+        url=None,
+        har_mode=HAR_MODE_LIVE,
+        har_path=None,
+        pipeline_tabs=0,
+        launch_profile=DEFAULT_LAUNCH_PROFILE,
+    ):
         """
         Initializes the BuyBot with the provided user credentials and settings.
 
@@ -34,86 +51,190 @@ class BuyBot:
             password (str): User's Amazon password.
             headless (bool, optional): Run browser headlessly. Defaults to True.
             url (str, optional): URL to navigate to. Usually Amazon homepage.
+            har_mode (str, optional): Network mode. Defaults to "live".
+            har_path (str, optional): HAR file to record to or replay from.
+            pipeline_tabs (int, optional): Speculative tab budget. Defaults to 0.
+            launch_profile (str, optional): Chromium launch-argument profile.
+                Defaults to "default".
         """
         self.email = email
         self.password = password
         self.headless = headless
         self.url = url
+        self.har_mode = har_mode
+        self.har_path = har_path
+        self.pipeline_tabs = pipeline_tabs
+        self.launch_profile = launch_profile
 
-    def run_purchase_flow(self) -> None:
+    def run_purchase_flow(self, browser=None) -> RunRecorder:
         """
         Executes the full automated purchase flow on Amazon.
+
+        Each step is timed and the finished run is stored in the run
+        history, whatever its outcome. Steps that fail without an exception
+        (e.g. login validation) do not raise; check the returned status.
+
+        Args:
+            browser (Browser, optional): Running browser to use, e.g. one
+                handed over by BrowserPool.run. A new browser is launched
+                for the run if omitted.
+
+        Returns:
+            RunRecorder: The finished run, with its status and failing step.
         """
         logger.info("Starting the purchase flow...")
 
+        run = RunRecorder(self.email, mode=self.har_mode)
+        try:
+            self._run_steps(run, browser)
+        except Exception as error:
+            run.mark_error(error)
+            raise
+        finally:
+            run.finish()
+            try:
+                get_run_history_store().record(run)
+            except Exception as error:
+                # A history problem must not change the result of the flow
+                logger.exception(f"Could not record run {run.run_id}: {error}")
+            logger.info(
+                f"Run {run.run_id} ({run.mode}) finished with status "
+                f"{run.status!r} in {run.duration_ms:.0f} ms"
+            )
+
+        return run
+
+    def _run_steps(self, run: RunRecorder, browser=None) -> None:
+        """
+        Runs the purchase flow steps, recording each one.
+
+        Args:
+            run (RunRecorder): Recorder for the current run.
+            browser (Browser, optional): Running browser to open the context in.
+        """
         # Launch the browser with context using BaseBot
-        with BaseBot(headless=self.headless) as bot:
+        with BaseBot(
+            headless=self.headless,
+            har_mode=self.har_mode,
+            har_path=self.har_path,
+            launch_profile=self.launch_profile,
+            shared_browser=browser,
+        ) as bot:
             page: Page = bot.page
-            utils = PlaywrightUtils(page)
+            utils = PlaywrightUtils(page, tab_budget=self.pipeline_tabs)
 
             # Open the Amazon homepage
-            logger.info("Opening Amazon homepage...")
-            utils.open_page(self.url)
+            with run.step("open_home"):
+                logger.info("Opening Amazon homepage...")
+                utils.open_page(self.url)
 
             # Navigate to the login page and perform login
-            logger.info("Navigating to login...")
-            utils.wait_for_clickable_and_click(SELECTORS_AMAZON["login_button_home"])
-            utils.login(
-                email=self.email,
-                password=self.password,
-                selectors=SELECTORS_AMAZON,
-            )
+            with run.step("login"):
+                logger.info("Navigating to login...")
+                utils.wait_for_clickable_and_click(SELECTORS_AMAZON["login_button_home"])
+                utils.login(
+                    email=self.email,
+                    password=self.password,
+                    selectors=SELECTORS_AMAZON,
+                )
+
+            # Load the TV listing resolved by a previous run while login completes
+            tv_listing_url = utils.resolved_url("tv_listing")
+            if tv_listing_url:
+                utils.prefetch("tv_listing", tv_listing_url)
 
             # Validate if login was successful
-            logger.info("Verifying successful login...")
-            login_success = utils.validate_login(SELECTORS_AMAZON["login_button_home"])
+            with run.step("validate_login"):
+                logger.info("Verifying successful login...")
+                login_success = utils.validate_login(SELECTORS_AMAZON["login_button_home"])
             if not login_success:
                 logger.error("Login validation failed. Aborting flow.")
+                run.fail("validate_login", "Login validation failed.")
                 return
 
-            # Open the hamburger menu (side menu)
-            logger.info("Opening hamburger menu...")
-            utils.wait_for_clickable_and_click(SELECTORS_AMAZON["hamburger_menu"])
-
-            # Navigate through categories to reach TVs
-            logger.info("Selecting 'Electrónicos' category...")
-            utils.click_by_exact_text(
-                css_selector=SELECTORS_AMAZON["hamburger_option_template"],
-                exact_text="Electrónicos",
-            )
-
-            logger.info("Selecting 'Televisión y Video' subcategory...")
-            utils.click_hamburger_item_by_label("Televisión y Video")
-
-            # Filter by TV size
-            logger.info("Filtering by size 'DE 48\" A 55\"'...")
-            utils.click_text_block_by_label('DE 48" A 55"')
-
-            # Click on the first product listed
-            logger.info("Clicking the first visible product...")
-            utils.click_first_product()
-
-            # Add the product to the shopping cart
-            logger.info("Adding product to cart...")
-            utils.wait_for_clickable_and_click(SELECTORS_AMAZON["add_to_cart"])
-
-            # Close optional warranty popup if it appears
-            logger.info("Checking for warranty popup...")
-            utils.close_warranty_popup()
+            with run.step("navigate_category"):
+                if utils.take_prefetched(
+                    "tv_listing",
+                    ready_selector=SELECTORS_AMAZON["product_listing_item"],
+                ):
+                    logger.info("Using prefetched 'Televisión y Video' listing.")
+                else:
+                    # Open the hamburger menu (side menu)
+                    logger.info("Opening hamburger menu...")
+                    utils.wait_for_clickable_and_click(SELECTORS_AMAZON["hamburger_menu"])
+
+                    # Navigate through categories to reach TVs
+                    logger.info("Selecting 'Electrónicos' category...")
+                    utils.click_by_exact_text(
+                        css_selector=SELECTORS_AMAZON["hamburger_option_template"],
+                        exact_text="Electrónicos",
+                    )
+
+                    logger.info("Selecting 'Televisión y Video' subcategory...")
+                    if not utils.click_hamburger_item_by_label("Televisión y Video"):
+                        run.fail(
+                            "navigate_category",
+                            "Could not open the 'Televisión y Video' listing.",
+                        )
+                    else:
+                        # Remember the listing so later runs can prefetch it
+                        utils.remember_url("tv_listing")
+
+            with run.step("select_product"):
+                # Filter by TV size
+                logger.info("Filtering by size 'DE 48\" A 55\"'...")
+                utils.click_text_block_by_label('DE 48" A 55"')
+
+                # Click on the first product listed
+                logger.info("Clicking the first visible product...")
+                if not utils.click_first_product():
+                    run.fail("select_product", "Could not open the first product.")
+
+            with run.step("add_to_cart"):
+                # Add the product to the shopping cart
+                logger.info("Adding product to cart...")
+                if not utils.wait_for_clickable_and_click(
+                    SELECTORS_AMAZON["add_to_cart"]
+                ):
+                    run.fail("add_to_cart", "Could not click 'Add to cart'.")
+
+                # Load the cart while the popup and confirmation are checked
+                utils.prefetch("cart", urljoin(self.url, URL_PATHS_AMAZON["cart"]))
+
+                # Close optional warranty popup if it appears
+                logger.info("Checking for warranty popup...")
+                utils.close_warranty_popup()
 
             # Confirm product was added to the cart
-            logger.info("Confirming product is in the cart...")
-            if utils.confirm_add_to_cart():
-                logger.info("Item successfully added to cart.")
+            with run.step("confirm_cart"):
+                logger.info("Confirming product is in the cart...")
+                if utils.confirm_add_to_cart():
+                    logger.info("Item successfully added to cart.")
+                else:
+                    logger.warning("Item may not have been added to the cart.")
+                    run.fail(
+                        "confirm_cart", "Could not confirm the item is in the cart."
+                    )
+
+            with run.step("checkout"):
+                # Go to the cart page
+                logger.info("Navigating to cart...")
+                if not utils.take_prefetched(
+                    "cart", ready_selector=SELECTORS_AMAZON["buy_now"]
+                ) and not utils.wait_for_clickable_and_click(
+                    SELECTORS_AMAZON["nav_cart"]
+                ):
+                    run.fail("checkout", "Could not open the cart.")
+
+                # Proceed to buy
+                logger.info("Proceeding to checkout...")
+                if not utils.wait_for_clickable_and_click(SELECTORS_AMAZON["buy_now"]):
+                    run.fail("checkout", "Could not click 'Proceed to checkout'.")
+
+            utils.discard_prefetched()
+            if run.status is None:
+                logger.info("Purchase flow completed successfully.")
             else:
-                logger.warning("Item may not have been added to the cart.")
-
-            # Go to the cart page
-            logger.info("Navigating to cart...")
-            utils.wait_for_clickable_and_click(SELECTORS_AMAZON["nav_cart"])
-
-            # Proceed to buy
-            logger.info("Proceeding to checkout...")
-            utils.wait_for_clickable_and_click(SELECTORS_AMAZON["buy_now"])
-
-            logger.info("Purchase flow completed successfully.")
+                logger.warning(
+                    f"Purchase flow finished with a failure at {run.error_step!r}."
+                )
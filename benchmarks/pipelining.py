@@ -0,0 +1,76 @@
+"""
+Benchmark of end-to-end purchase flow latency with and without pipelining.
+
+Runs the BuyBot flow several times on a single tab and with speculative
+tabs, then prints the latency of each configuration. Use HAR replay mode
+(`HAR_MODE=replay`) for repeatable numbers.
+
+Usage:
+    python -m benchmarks.pipelining --runs 5 --tabs 2
+
+Credentials are read from the AMAZON_EMAIL and AMAZON_PASSWORD variables.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from automation.test_cases.buy_bot import BuyBot
+from config.settings import Settings, get_settings
+from storage.run_history import percentile
+
+
+def time_flow(settings: Settings, pipeline_tabs: int) -> float:
+    """
+    Runs the purchase flow once and returns its duration.
+
+    Args:
+        settings (Settings): Loaded application settings.
+        pipeline_tabs (int): Speculative tab budget.
+
+    Returns:
+        float: Duration in milliseconds.
+    """
+    bot = BuyBot(
+        email=os.environ["AMAZON_EMAIL"],
+        password=os.environ["AMAZON_PASSWORD"],
+        headless=settings.headless,
+        url=settings.amazon_url,
+        har_mode=settings.har_mode,
+        har_path=settings.har_path,
+        pipeline_tabs=pipeline_tabs,
+        launch_profile=settings.launch_profile,
+    )
+    started = time.perf_counter()
+    bot.run_purchase_flow()
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per configuration.")
+    parser.add_argument("--tabs", type=int, default=2, help="Tab budget when pipelining.")
+    args = parser.parse_args()
+
+    settings = get_settings()
+
+    # Warm-up run resolves the URLs that pipelined runs prefetch
+    time_flow(settings, pipeline_tabs=0)
+
+    results = {}
+    for label, tabs in (("sequential", 0), (f"pipelined ({args.tabs} tabs)", args.tabs)):
+        results[label] = [time_flow(settings, tabs) for _ in range(args.runs)]
+
+    print(f"{'configuration':<24}{'mean ms':>12}{'p50 ms':>12}{'p95 ms':>12}")
+    for label, durations in results.items():
+        print(
+            f"{label:<24}"
+            f"{statistics.mean(durations):>12.0f}"
+            f"{percentile(durations, 0.50):>12.0f}"
+            f"{percentile(durations, 0.95):>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
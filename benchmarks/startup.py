@@ -0,0 +1,145 @@
+"""
+Benchmark of API cold start: import time, time-to-ready and first-run latency.
+
+For each Chromium launch profile, starts the API with uvicorn in a
+subprocess and measures:
+- import: time to import `main` in a fresh interpreter
+- health: time until GET /health answers (server accepts requests)
+- ready: time until GET /ready answers (driver and browser prewarmed)
+- first run: duration of the first POST /api/run-bot, if --first-run is set
+
+Usage:
+    python -m benchmarks.startup --profiles default fast --first-run
+
+The first run uses the AMAZON_EMAIL and AMAZON_PASSWORD variables.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def measure_import(repeats: int) -> float:
+    """
+    Imports `main` in fresh interpreters and returns the median time.
+
+    Returns:
+        float: Median import time in milliseconds.
+    """
+    code = (
+        "import time; started = time.perf_counter(); import main; "
+        "print((time.perf_counter() - started) * 1000)"
+    )
+    durations = [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.strip()
+        )
+        for _ in range(repeats)
+    ]
+    return statistics.median(durations)
+
+
+def wait_for(url: str, started: float, timeout: float) -> float:
+    """
+    Polls a URL until it answers with 200.
+
+    Returns:
+        float: Milliseconds from `started` until the first 200 response.
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return (time.perf_counter() - started) * 1000
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} did not become available in {timeout} s")
+
+
+def first_run(base_url: str) -> float:
+    """
+    Triggers the purchase flow once and returns its duration.
+
+    Returns:
+        float: Request duration in milliseconds.
+    """
+    body = json.dumps(
+        {
+            "email": os.environ["AMAZON_EMAIL"],
+            "password": os.environ["AMAZON_PASSWORD"],
+            "headless": True,
+        }
+    ).encode("utf-8")
+    request = urllib.request.Request(
+        f"{base_url}/api/run-bot",
+        data=body,
+        headers={"Content-Type": "application/json"},
+    )
+    started = time.perf_counter()
+    try:
+        urllib.request.urlopen(request, timeout=900).close()
+    except urllib.error.HTTPError as error:
+        print(f"  first run returned {error.code}")
+    return (time.perf_counter() - started) * 1000
+
+
+def measure_server(profile: str, port: int, run_first: bool) -> dict:
+    """
+    Starts the API with a launch profile and measures time-to-ready.
+
+    Returns:
+        dict: Milliseconds to health, to ready and for the first run.
+    """
+    env = dict(os.environ, LAUNCH_PROFILE=profile)
+    base_url = f"http://127.0.0.1:{port}"
+
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        result = {
+            "health": wait_for(f"{base_url}/health", started, timeout=60),
+            "ready": wait_for(f"{base_url}/ready", started, timeout=120),
+            "first_run": first_run(base_url) if run_first else None,
+        }
+    finally:
+        server.terminate()
+        server.wait()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", nargs="+", default=["default", "fast"], help="Launch profiles to compare.")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh imports to time.")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the benchmark server.")
+    parser.add_argument("--first-run", action="store_true", help="Also time the first /api/run-bot call.")
+    args = parser.parse_args()
+
+    print(f"import main: {measure_import(args.repeats):.0f} ms (median of {args.repeats})")
+    print(f"{'profile':<10}{'health ms':>12}{'ready ms':>12}{'first run ms':>15}")
+    for profile in args.profiles:
+        result = measure_server(profile, args.port, args.first_run)
+        first = f"{result['first_run']:.0f}" if result["first_run"] is not None else "-"
+        print(f"{profile:<10}{result['health']:>12.0f}{result['ready']:>12.0f}{first:>15}")
+
+
+if __name__ == "__main__":
+    main()
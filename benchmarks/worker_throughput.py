@@ -0,0 +1,107 @@
+"""
+Benchmark of job throughput as worker processes are added.
+
+Enqueues a batch of simulated runs into a fresh SQLite job queue, drains
+it with 1, 2, 4... worker processes and prints jobs per second for each
+count. Correctness (every job drained, redelivery after a worker crash)
+is covered by tests/test_job_queue.py.
+
+Usage:
+    python -m benchmarks.worker_throughput --jobs 40 --job-seconds 0.2 --workers 1 2 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from jobs.job_queue import SQLiteJobQueue
+from jobs.worker import Worker
+
+
+def simulated_run(payload: dict) -> dict:
+    """
+    Stands in for a purchase flow by sleeping for the payload duration.
+    """
+    time.sleep(payload["duration"])
+    return {"success": True, "message": "Simulated run completed."}
+
+
+def drain(db_path: str, visibility_timeout: float) -> None:
+    """
+    Worker process body: processes jobs until the queue is empty.
+    """
+    worker = Worker(
+        SQLiteJobQueue(db_path),
+        simulated_run,
+        visibility_timeout=visibility_timeout,
+        poll_interval=0.05,
+    )
+    while worker.run_once():
+        pass
+
+
+def measure(
+    workers: int, jobs: int, job_seconds: float, directory: str
+) -> float:
+    """
+    Drains a batch of jobs with the given number of worker processes.
+
+    Returns:
+        float: Throughput in jobs per second.
+    """
+    db_path = os.path.join(directory, f"throughput_{workers}.db")
+    queue = SQLiteJobQueue(db_path)
+    for _ in range(jobs):
+        queue.enqueue({"duration": job_seconds})
+
+    started = time.perf_counter()
+    processes = [
+        multiprocessing.Process(target=drain, args=(db_path, 30))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    return jobs / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--jobs", type=int, default=40, help="Jobs per measurement."
+    )
+    parser.add_argument(
+        "--job-seconds",
+        type=float,
+        default=0.2,
+        help="Duration of each simulated run.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="Worker counts to measure.",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'workers':>8}{'jobs/s':>12}{'speed-up':>12}")
+        baseline = None
+        for workers in args.workers:
+            throughput = measure(
+                workers, args.jobs, args.job_seconds, directory
+            )
+            baseline = baseline or throughput
+            print(
+                f"{workers:>8}{throughput:>12.2f}{throughput / baseline:>11.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,14 +8,30 @@ LOG_DIR = "logs"
 LOG_FILE_NAME = "automation.log"
 LOG_FILE_PATH = os.path.join(LOG_DIR, LOG_FILE_NAME)
 
-# Create logs directory if it doesn't exist
-os.makedirs(LOG_DIR, exist_ok=True)
 
-# Backup previous log if it exists
-if os.path.exists(LOG_FILE_PATH):
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = os.path.join(LOG_DIR, f"automation_{timestamp}.log")
-    shutil.move(LOG_FILE_PATH, backup_path)
+class BackupOnOpenFileHandler(logging.FileHandler):
+    """
+    File handler that backs up the previous log file when it first opens.
+
+    The handler is created with `delay=True`, so creating the logs
+    directory and moving the previous log aside happen on the first
+    record instead of at import time.
+    """
+
+    def _open(self):
+        log_dir = os.path.dirname(self.baseFilename)
+
+        # Create logs directory if it doesn't exist
+        os.makedirs(log_dir, exist_ok=True)
+
+        # Backup previous log if it exists
+        if os.path.exists(self.baseFilename):
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            backup_path = os.path.join(log_dir, f"automation_{timestamp}.log")
+            shutil.move(self.baseFilename, backup_path)
+
+        return super()._open()
+
 
 # Set up logger
 logger = logging.getLogger("automation_logger")
@@ -24,7 +40,9 @@ logger.setLevel(logging.DEBUG)
 formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 
 # File handler
-file_handler = logging.FileHandler(LOG_FILE_PATH, mode="w", encoding="utf-8")
+file_handler = BackupOnOpenFileHandler(
+    LOG_FILE_PATH, mode="w", encoding="utf-8", delay=True
+)
 file_handler.setFormatter(formatter)
 
 # Console handler
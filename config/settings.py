@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,18 +10,59 @@ class Settings(BaseSettings):
     - Amazon target URL
     - Headless browser mode
     - API host and port for the FastAPI service
+    - Location of the run history database
+    - HAR record/replay mode for the browser network
+    - Idempotency result cache limits for the run endpoint
+    - Speculative tab budget for pipelined runs
+    - Inline or queued execution of runs and the shared job queue
+    - Browser prewarming and Chromium launch profile
 
     Attributes:
         amazon_url (str): The base URL for Amazon automation (e.g., https://www.amazon.com.mx).
         headless (bool): Whether to run the browser in headless mode (default: True).
         api_host (str): The host address for the FastAPI server (default: 127.0.0.1).
         api_port (int): The port number for the FastAPI server (default: 8000).
+        run_history_db (str): Path to the SQLite run history database.
+        har_mode (str): Browser network mode: live, record or replay (default: live).
+        har_path (str): HAR file used in record and replay modes.
+        idempotency_ttl_seconds (int): How long completed run results are kept
+            for repeated idempotency keys (default: 600).
+        idempotency_max_entries (int): Maximum number of cached run results (default: 1000).
+        pipeline_tabs (int): Maximum speculative tabs used to prefetch upcoming
+            pages; 0 disables pipelining (default: 0).
+        run_mode (str): "inline" runs the bot inside the API process, "queue"
+            hands runs to worker processes through the job queue (default: inline).
+        job_queue_url (str): Redis URL (redis://...) or SQLite path of the job queue.
+        job_max_attempts (int): Deliveries allowed per job before it fails (default: 3).
+        job_visibility_timeout (int): Seconds a leased job stays invisible to
+            other workers without a heartbeat (default: 120).
+        job_result_timeout (int): Seconds the API waits for a queued run (default: 900).
+        prewarm (bool): Start the Playwright driver and Chromium in the background
+            when the API starts (default: True).
+        launch_profile (str): Chromium launch-argument profile: default, fast or ci
+            (default: default).
+        browser_pool_size (int): Long-lived browsers kept per process; runs reuse
+            them with a fresh context. 0 launches a browser per run (default: 4).
     """
 
     amazon_url: str
     headless: bool = True
     api_host: str = "127.0.0.1"
     api_port: int = 8000
+    run_history_db: str = "data/run_history.db"
+    har_mode: str = "live"
+    har_path: str = "data/har/purchase_flow.har"
+    idempotency_ttl_seconds: int = 600
+    idempotency_max_entries: int = 1000
+    pipeline_tabs: int = 0
+    run_mode: str = "inline"
+    job_queue_url: str = "data/jobs.db"
+    job_max_attempts: int = 3
+    job_visibility_timeout: int = 120
+    job_result_timeout: int = 900
+    prewarm: bool = True
+    launch_profile: str = "default"
+    browser_pool_size: int = 4
 
     class Config:
         """
@@ -33,3 +75,16 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
         extra = "ignore"
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Returns the application settings, reading the environment only once.
+
+    The instance is shared by the whole process and must not be mutated.
+
+    Returns:
+        Settings: Cached settings instance.
+    """
+    return Settings()
@@ -0,0 +1,899 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+
+from config.logs.logger_config import logger
+from config.settings import Settings, get_settings
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_LEASED = "leased"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+# Error stored on jobs that were never leased before they expired
+JOB_EXPIRED_ERROR = "Job expired before a worker leased it."
+
+
+class JobLeaseLost(Exception):
+    """
+    Raised when a worker reports on a job whose lease it no longer holds.
+    """
+
+
+class JobTimeout(Exception):
+    """
+    Raised when a job does not finish within the expected time.
+    """
+
+
+@dataclass
+class Job:
+    """
+    A job leased by a worker.
+
+    Attributes:
+        job_id (str): Job identifier.
+        payload (dict): Job input.
+        attempts (int): Number of times the job has been leased.
+        lease_token (str): Token proving ownership of the current lease.
+        group (str): Group of the job, if any. Jobs of one group never run
+            at the same time.
+    """
+
+    job_id: str
+    payload: dict
+    attempts: int
+    lease_token: str
+    group: str = None
+
+
+class JobQueue(ABC):
+    """
+    Durable work queue shared by API nodes and worker nodes.
+
+    API nodes enqueue jobs and wait for their results. Workers lease jobs
+    for a visibility timeout; a job whose lease expires before it is
+    completed (e.g. the worker crashed) is delivered again to another
+    worker, up to `max_attempts` times.
+
+    - Enqueueing with an existing job id attaches to that job instead of
+      adding a new one, so retries from any node share one run.
+    - Jobs of the same group (e.g. the same account) are never leased
+      while another job of that group is leased.
+    - Jobs can expire, or be cancelled, while still queued. Either way
+      they fail and their payload is dropped.
+
+    Attributes:
+        max_attempts (int): Deliveries allowed before a job is failed.
+        result_ttl (int): Seconds a succeeded job is kept for requests
+            attaching to it.
+    """
+
+    def __init__(self, max_attempts: int = 3, result_ttl: int = 86400):
+        """
+        Initializes the queue.
+
+        Args:
+            max_attempts (int, optional): Deliveries allowed per job. Defaults to 3.
+            result_ttl (int, optional): Seconds succeeded jobs are kept.
+                Defaults to one day.
+        """
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+
+    def enqueue(
+        self,
+        payload: dict,
+        job_id: str = None,
+        group: str = None,
+        expires_in: float = None,
+    ) -> str:
+        """
+        Adds a job to the queue, or attaches to an existing job with the same id.
+
+        An existing job is reused while it is queued, running, or
+        succeeded less than `result_ttl` seconds ago. A failed job is
+        queued again, like a run without an idempotency key would be.
+
+        Args:
+            payload (dict): JSON-serializable job input.
+            job_id (str, optional): Job identifier. Generated if omitted.
+            group (str, optional): Jobs of one group never run concurrently.
+            expires_in (float, optional): Seconds the job may wait in the
+                queue before it expires. Never expires if omitted.
+
+        Returns:
+            str: The job identifier.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        expires_at = time.time() + expires_in if expires_in else None
+        created = self._enqueue(job_id, json.dumps(payload), group, expires_at)
+        if not created:
+            logger.info(f"Job {job_id} already exists, attaching to it")
+        return job_id
+
+    def lease(self, worker_id: str, visibility_timeout: float):
+        """
+        Leases the next available job.
+
+        Jobs that already used all their deliveries, or that lost their
+        payload, are failed instead of being returned.
+
+        Args:
+            worker_id (str): Identifier of the leasing worker.
+            visibility_timeout (float): Seconds before the lease expires.
+
+        Returns:
+            Job | None: The leased job, or None if no job is available.
+        """
+        while True:
+            token = uuid.uuid4().hex
+            leased = self._lease(worker_id, visibility_timeout, token)
+            if leased is None:
+                return None
+
+            job_id, payload, attempts, group = leased
+            job = Job(job_id, None, attempts, token, group)
+
+            if payload is None:
+                error = "Job payload is missing."
+            elif attempts > self.max_attempts:
+                error = "Job exceeded the maximum number of attempts."
+            else:
+                job.payload = json.loads(payload)
+                return job
+
+            logger.error(f"Failing job {job_id}: {error}")
+            try:
+                self.fail(job, error)
+            except JobLeaseLost:
+                pass
+
+    def wait_for_result(
+        self, job_id: str, timeout: float, poll_interval: float = 0.5
+    ) -> dict:
+        """
+        Blocks until a job finishes.
+
+        Args:
+            job_id (str): Job identifier.
+            timeout (float): Maximum seconds to wait.
+            poll_interval (float, optional): Seconds between status checks.
+
+        Returns:
+            dict: The finished job (see get).
+
+        Raises:
+            JobTimeout: If the job does not finish in time, or disappears.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is not None and job["status"] in FINISHED_STATUSES:
+                return job
+            if job is None:
+                raise JobTimeout(f"Job {job_id} no longer exists")
+            if time.monotonic() >= deadline:
+                raise JobTimeout(
+                    f"Job {job_id} did not finish within {timeout} s"
+                )
+            time.sleep(poll_interval)
+
+    # Backend operations
+
+    @abstractmethod
+    def _enqueue(
+        self, job_id: str, payload: str, group: str, expires_at: float
+    ) -> bool:
+        """
+        Stores a job unless a reusable job with the same id exists, and
+        expires queued jobs past their deadline.
+
+        Returns:
+            bool: True if the job was (re)queued, False if it already existed.
+        """
+
+    @abstractmethod
+    def _lease(self, worker_id: str, visibility_timeout: float, token: str):
+        """
+        Returns (job_id, payload, attempts, group) for a newly leased job,
+        or None. The payload is None if it is missing.
+
+        Expires queued jobs past their deadline, and skips jobs whose group
+        already has a leased job.
+        """
+
+    @abstractmethod
+    def extend_lease(self, job: Job, visibility_timeout: float) -> None:
+        """
+        Pushes back the lease expiry of a job that is still being worked on.
+
+        Args:
+            job (Job): The leased job.
+            visibility_timeout (float): Seconds from now before the lease expires.
+
+        Raises:
+            JobLeaseLost: If the lease expired and the job was redelivered.
+        """
+
+    @abstractmethod
+    def complete(self, job: Job, result: dict) -> None:
+        """
+        Marks a job as succeeded and stores its result.
+
+        Args:
+            job (Job): The leased job.
+            result (dict): JSON-serializable job output.
+
+        Raises:
+            JobLeaseLost: If the lease expired and the job was redelivered.
+        """
+
+    @abstractmethod
+    def fail(self, job: Job, error: str) -> None:
+        """
+        Marks a job as failed. Failed jobs are not retried.
+
+        Args:
+            job (Job): The leased job.
+            error (str): Error description.
+
+        Raises:
+            JobLeaseLost: If the lease expired and the job was redelivered.
+        """
+
+    @abstractmethod
+    def cancel(self, job_id: str, reason: str) -> bool:
+        """
+        Fails a job that is still queued and drops its payload.
+
+        Leased jobs are left alone; they are already running.
+
+        Args:
+            job_id (str): Job identifier.
+            reason (str): Error stored on the job.
+
+        Returns:
+            bool: True if the job was cancelled.
+        """
+
+    @abstractmethod
+    def get(self, job_id: str):
+        """
+        Returns the state of a job.
+
+        Args:
+            job_id (str): Job identifier.
+
+        Returns:
+            dict | None: Job with status, attempts, result and error, or None
+            if it does not exist.
+        """
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue stored in a SQLite database file.
+
+    Suitable for several worker processes on one machine (and for tests).
+    Writes run inside `BEGIN IMMEDIATE` transactions so two workers never
+    get the same job.
+
+    Attributes:
+        db_path (str): Path to the SQLite database file.
+    """
+
+    def __init__(
+        self, db_path: str, max_attempts: int = 3, result_ttl: int = 86400
+    ):
+        """
+        Initializes the queue and creates its table.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+            max_attempts (int, optional): Deliveries allowed per job. Defaults to 3.
+            result_ttl (int, optional): Seconds succeeded jobs are kept.
+                Defaults to one day.
+        """
+        super().__init__(max_attempts, result_ttl)
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL UNIQUE,
+                    payload TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_token TEXT,
+                    worker_id TEXT,
+                    lease_expires_at REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL,
+                    group_key TEXT,
+                    expires_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_status_seq ON jobs(status, seq);
+                CREATE INDEX IF NOT EXISTS idx_jobs_lease_expires_at
+                    ON jobs(status, lease_expires_at);
+                CREATE INDEX IF NOT EXISTS idx_jobs_group_status
+                    ON jobs(group_key, status);
+                """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a connection in autocommit mode; transactions are explicit.
+        """
+        connection = sqlite3.connect(
+            self.db_path, timeout=30, isolation_level=None
+        )
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Yields a connection inside a `BEGIN IMMEDIATE` transaction, which
+        holds the write lock so concurrent nodes cannot interleave.
+        """
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            yield connection
+            connection.execute("COMMIT")
+        except Exception:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _expire_queued(connection: sqlite3.Connection, now: float) -> None:
+        """
+        Fails queued jobs past their deadline and drops their payload.
+        """
+        connection.execute(
+            """
+            UPDATE jobs SET status = ?, error = ?, payload = NULL,
+                finished_at = ?
+            WHERE status = ? AND expires_at IS NOT NULL AND expires_at <= ?
+            """,
+            (JOB_FAILED, JOB_EXPIRED_ERROR, now, JOB_QUEUED, now),
+        )
+
+    def _enqueue(
+        self, job_id: str, payload: str, group: str, expires_at: float
+    ) -> bool:
+        now = time.time()
+        with self._transaction() as connection:
+            self._expire_queued(connection, now)
+
+            row = connection.execute(
+                "SELECT status, finished_at FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is not None:
+                reusable = row["status"] in (JOB_QUEUED, JOB_LEASED) or (
+                    row["status"] == JOB_SUCCEEDED
+                    and row["finished_at"] > now - self.result_ttl
+                )
+                if reusable:
+                    return False
+                # Replaced rather than updated so it joins the back of the queue
+                connection.execute(
+                    "DELETE FROM jobs WHERE job_id = ?", (job_id,)
+                )
+
+            connection.execute(
+                """
+                INSERT INTO jobs (job_id, payload, status, created_at,
+                    group_key, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, payload, JOB_QUEUED, now, group, expires_at),
+            )
+        return True
+
+    def _lease(self, worker_id: str, visibility_timeout: float, token: str):
+        now = time.time()
+        with self._transaction() as connection:
+            self._expire_queued(connection, now)
+
+            row = connection.execute(
+                """
+                SELECT job_id, payload, attempts, group_key FROM jobs AS job
+                WHERE (status = ? OR (status = ? AND lease_expires_at <= ?))
+                    AND (group_key IS NULL OR NOT EXISTS (
+                        SELECT 1 FROM jobs AS running
+                        WHERE running.group_key = job.group_key
+                            AND running.job_id != job.job_id
+                            AND running.status = ?
+                            AND running.lease_expires_at > ?
+                    ))
+                ORDER BY seq LIMIT 1
+                """,
+                (JOB_QUEUED, JOB_LEASED, now, JOB_LEASED, now),
+            ).fetchone()
+            if row is None:
+                return None
+
+            attempts = row["attempts"] + 1
+            connection.execute(
+                """
+                UPDATE jobs SET status = ?, attempts = ?, lease_token = ?,
+                    worker_id = ?, lease_expires_at = ?
+                WHERE job_id = ?
+                """,
+                (
+                    JOB_LEASED,
+                    attempts,
+                    token,
+                    worker_id,
+                    now + visibility_timeout,
+                    row["job_id"],
+                ),
+            )
+        return row["job_id"], row["payload"], attempts, row["group_key"]
+
+    def _update_leased(self, job: Job, assignments: str, params: tuple) -> None:
+        """
+        Updates a job only if the caller still holds its lease.
+
+        Raises:
+            JobLeaseLost: If the lease token no longer matches.
+        """
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                f"UPDATE jobs SET {assignments} "
+                "WHERE job_id = ? AND status = ? AND lease_token = ?",
+                (*params, job.job_id, JOB_LEASED, job.lease_token),
+            )
+        if cursor.rowcount == 0:
+            raise JobLeaseLost(f"Lease on job {job.job_id} was lost")
+
+    def extend_lease(self, job: Job, visibility_timeout: float) -> None:
+        self._update_leased(
+            job, "lease_expires_at = ?", (time.time() + visibility_timeout,)
+        )
+
+    def complete(self, job: Job, result: dict) -> None:
+        # The payload holds credentials, so it is dropped once the job is done
+        self._update_leased(
+            job,
+            "status = ?, result = ?, payload = NULL, finished_at = ?",
+            (JOB_SUCCEEDED, json.dumps(result), time.time()),
+        )
+
+    def fail(self, job: Job, error: str) -> None:
+        self._update_leased(
+            job,
+            "status = ?, error = ?, payload = NULL, finished_at = ?",
+            (JOB_FAILED, error, time.time()),
+        )
+
+    def cancel(self, job_id: str, reason: str) -> bool:
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                """
+                UPDATE jobs SET status = ?, error = ?, payload = NULL,
+                    finished_at = ?
+                WHERE job_id = ? AND status = ?
+                """,
+                (JOB_FAILED, reason, time.time(), job_id, JOB_QUEUED),
+            )
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str):
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT job_id, status, attempts, worker_id, result, error "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+# Fails queued jobs past their deadline and drops their payload.
+# Shared by the enqueue and lease scripts; expects `now` and `prefix`.
+_REDIS_EXPIRE_QUEUED = """
+local expiring = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)
+for _, id in ipairs(expiring) do
+    redis.call('ZREM', KEYS[3], id)
+    local key = prefix .. ':job:' .. id
+    if redis.call('HGET', key, 'status') == 'queued' then
+        redis.call('LREM', KEYS[1], 0, id)
+        redis.call('HSET', key, 'status', 'failed', 'error', expired_error,
+            'finished_at', now)
+        redis.call('HDEL', key, 'payload')
+        redis.call('EXPIRE', key, result_ttl)
+    end
+end
+"""
+
+# Adds a job, or attaches to a reusable job with the same id.
+# KEYS: ready list, leased sorted set, expiry sorted set
+# ARGV: now, key prefix, job id, payload, group (or ''), expiry (or ''),
+#       result TTL, expired error
+_REDIS_ENQUEUE = (
+    """
+local now = tonumber(ARGV[1])
+local prefix = ARGV[2]
+local result_ttl = ARGV[7]
+local expired_error = ARGV[8]
+"""
+    + _REDIS_EXPIRE_QUEUED
+    + """
+local key = prefix .. ':job:' .. ARGV[3]
+local status = redis.call('HGET', key, 'status')
+-- Succeeded jobs stay reusable until their hash expires
+if status and status ~= 'failed' then
+    return 0
+end
+redis.call('DEL', key)
+redis.call('HSET', key, 'payload', ARGV[4], 'status', 'queued',
+    'attempts', 0, 'group', ARGV[5], 'created_at', now)
+redis.call('RPUSH', KEYS[1], ARGV[3])
+if ARGV[6] ~= '' then
+    redis.call('ZADD', KEYS[3], ARGV[6], ARGV[3])
+end
+return 1
+"""
+)
+
+# Requeues jobs whose lease expired, then leases the oldest job whose group
+# has no leased job. Requeued jobs get their lease token cleared, so the
+# worker that lost the lease can no longer complete them.
+# KEYS: ready list, leased sorted set, expiry sorted set
+# ARGV: now, key prefix, lease expiry, lease token, worker id, result TTL,
+#       expired error, scan limit
+_REDIS_LEASE = (
+    """
+local now = tonumber(ARGV[1])
+local prefix = ARGV[2]
+local result_ttl = ARGV[6]
+local expired_error = ARGV[7]
+"""
+    + _REDIS_EXPIRE_QUEUED
+    + """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    local key = prefix .. ':job:' .. id
+    if redis.call('HGET', key, 'status') == 'leased' then
+        redis.call('HSET', key, 'status', 'queued')
+        redis.call('HDEL', key, 'lease_token')
+        local group = redis.call('HGET', key, 'group')
+        if group and group ~= '' then
+            local group_key = prefix .. ':group:' .. group
+            if redis.call('GET', group_key) == id then
+                redis.call('DEL', group_key)
+            end
+        end
+        redis.call('LPUSH', KEYS[1], id)
+    end
+end
+
+local candidates = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[8]) - 1)
+for _, id in ipairs(candidates) do
+    local key = prefix .. ':job:' .. id
+    if redis.call('HGET', key, 'status') ~= 'queued' then
+        -- Stale entry (finished, cancelled or gone): drop it
+        redis.call('LREM', KEYS[1], 0, id)
+    else
+        local group = redis.call('HGET', key, 'group')
+        local group_key = nil
+        local busy = false
+        if group and group ~= '' then
+            group_key = prefix .. ':group:' .. group
+            local holder = redis.call('GET', group_key)
+            busy = holder and holder ~= id
+                and redis.call('HGET', prefix .. ':job:' .. holder, 'status')
+                    == 'leased'
+        end
+        if not busy then
+            redis.call('LREM', KEYS[1], 1, id)
+            redis.call('ZREM', KEYS[3], id)
+            if group_key then
+                redis.call('SET', group_key, id)
+            end
+            local attempts = redis.call('HINCRBY', key, 'attempts', 1)
+            redis.call('HSET', key, 'status', 'leased', 'lease_token', ARGV[4],
+                'worker_id', ARGV[5])
+            redis.call('ZADD', KEYS[2], ARGV[3], id)
+            return {id, redis.call('HGET', key, 'payload'), attempts, group}
+        end
+    end
+end
+return nil
+"""
+)
+
+# Applies field updates to a job if the lease token still matches.
+# KEYS: job hash, leased sorted set
+# ARGV: lease token, job id, new lease expiry (or ''), result TTL (or ''),
+#       key prefix, field/value pairs...
+_REDIS_UPDATE_LEASED = """
+if redis.call('HGET', KEYS[1], 'status') ~= 'leased'
+    or redis.call('HGET', KEYS[1], 'lease_token') ~= ARGV[1] then
+    return 0
+end
+if ARGV[3] ~= '' then
+    redis.call('ZADD', KEYS[2], ARGV[3], ARGV[2])
+else
+    redis.call('ZREM', KEYS[2], ARGV[2])
+    redis.call('HDEL', KEYS[1], 'payload', 'lease_token')
+    local group = redis.call('HGET', KEYS[1], 'group')
+    if group and group ~= '' then
+        local group_key = ARGV[5] .. ':group:' .. group
+        if redis.call('GET', group_key) == ARGV[2] then
+            redis.call('DEL', group_key)
+        end
+    end
+end
+for i = 6, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+if ARGV[4] ~= '' then
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return 1
+"""
+
+# Fails a job that is still queued and drops its payload.
+# KEYS: job hash, ready list, expiry sorted set
+# ARGV: job id, error, now, result TTL
+_REDIS_CANCEL = """
+if redis.call('HGET', KEYS[1], 'status') ~= 'queued' then
+    return 0
+end
+redis.call('LREM', KEYS[2], 0, ARGV[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('HSET', KEYS[1], 'status', 'failed', 'error', ARGV[2],
+    'finished_at', ARGV[3])
+redis.call('HDEL', KEYS[1], 'payload')
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Job queue stored in a Redis-compatible server, shared by every node.
+
+    Jobs are hashes under `<prefix>:job:<id>`. Ready job ids wait in the
+    `<prefix>:ready` list, leased ids sit in the `<prefix>:leased` sorted
+    set scored by lease expiry, and queued jobs with a deadline sit in the
+    `<prefix>:expiring` sorted set. `<prefix>:group:<group>` holds the id
+    of the job leased for a group. Every operation that touches more than
+    one key runs as a Lua script so it is atomic across nodes.
+
+    Attributes:
+        prefix (str): Prefix of every key used by the queue.
+    """
+
+    # Ready jobs inspected per lease when looking for a free group
+    LEASE_SCAN_LIMIT = 100
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "at-web-driver",
+        max_attempts: int = 3,
+        result_ttl: int = 86400,
+    ):
+        """
+        Initializes the queue and registers its scripts.
+
+        Args:
+            url (str): Redis connection URL (e.g. redis://localhost:6379/0).
+            prefix (str, optional): Key prefix. Defaults to "at-web-driver".
+            max_attempts (int, optional): Deliveries allowed per job. Defaults to 3.
+            result_ttl (int, optional): Seconds finished jobs are kept. Defaults to one day.
+
+        Raises:
+            ImportError: If the redis package is not installed.
+        """
+        try:
+            import redis
+        except ImportError as error:
+            raise ImportError(
+                "The redis package is required for the Redis job queue: "
+                "pip install redis"
+            ) from error
+
+        super().__init__(max_attempts, result_ttl)
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._enqueue_script = self._redis.register_script(_REDIS_ENQUEUE)
+        self._lease_script = self._redis.register_script(_REDIS_LEASE)
+        self._update_script = self._redis.register_script(_REDIS_UPDATE_LEASED)
+        self._cancel_script = self._redis.register_script(_REDIS_CANCEL)
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def _queue_keys(self) -> list:
+        return [self._key("ready"), self._key("leased"), self._key("expiring")]
+
+    def _enqueue(
+        self, job_id: str, payload: str, group: str, expires_at: float
+    ) -> bool:
+        created = self._enqueue_script(
+            keys=self._queue_keys(),
+            args=[
+                time.time(),
+                self.prefix,
+                job_id,
+                payload,
+                group or "",
+                expires_at or "",
+                self.result_ttl,
+                JOB_EXPIRED_ERROR,
+            ],
+        )
+        return bool(created)
+
+    def _lease(self, worker_id: str, visibility_timeout: float, token: str):
+        now = time.time()
+        leased = self._lease_script(
+            keys=self._queue_keys(),
+            args=[
+                now,
+                self.prefix,
+                now + visibility_timeout,
+                token,
+                worker_id,
+                self.result_ttl,
+                JOB_EXPIRED_ERROR,
+                self.LEASE_SCAN_LIMIT,
+            ],
+        )
+        if not leased:
+            return None
+        job_id, payload, attempts, group = leased
+        return job_id, payload, int(attempts), group or None
+
+    def _update_leased(
+        self, job: Job, fields: dict, lease_expires_at=None
+    ) -> None:
+        """
+        Updates a job only if the caller still holds its lease.
+
+        Args:
+            job (Job): The leased job.
+            fields (dict): Hash fields to set.
+            lease_expires_at (float, optional): New lease expiry. When omitted
+                the job is finished: it leaves the leased set and frees its
+                group.
+
+        Raises:
+            JobLeaseLost: If the lease token no longer matches.
+        """
+        finished = lease_expires_at is None
+        args = [
+            job.lease_token,
+            job.job_id,
+            "" if finished else lease_expires_at,
+            self.result_ttl if finished else "",
+            self.prefix,
+        ]
+        for name, value in fields.items():
+            args.extend([name, value])
+
+        updated = self._update_script(
+            keys=[self._key(f"job:{job.job_id}"), self._key("leased")],
+            args=args,
+        )
+        if not updated:
+            raise JobLeaseLost(f"Lease on job {job.job_id} was lost")
+
+    def extend_lease(self, job: Job, visibility_timeout: float) -> None:
+        self._update_leased(
+            job, {}, lease_expires_at=time.time() + visibility_timeout
+        )
+
+    def complete(self, job: Job, result: dict) -> None:
+        self._update_leased(
+            job,
+            {
+                "status": JOB_SUCCEEDED,
+                "result": json.dumps(result),
+                "finished_at": time.time(),
+            },
+        )
+
+    def fail(self, job: Job, error: str) -> None:
+        self._update_leased(
+            job,
+            {"status": JOB_FAILED, "error": error, "finished_at": time.time()},
+        )
+
+    def cancel(self, job_id: str, reason: str) -> bool:
+        cancelled = self._cancel_script(
+            keys=[
+                self._key(f"job:{job_id}"),
+                self._key("ready"),
+                self._key("expiring"),
+            ],
+            args=[job_id, reason, time.time(), self.result_ttl],
+        )
+        return bool(cancelled)
+
+    def get(self, job_id: str):
+        data = self._redis.hgetall(self._key(f"job:{job_id}"))
+        if not data:
+            return None
+        return {
+            "job_id": job_id,
+            "status": data.get("status"),
+            "attempts": int(data.get("attempts", 0)),
+            "worker_id": data.get("worker_id"),
+            "result": (
+                json.loads(data["result"]) if data.get("result") else None
+            ),
+            "error": data.get("error"),
+        }
+
+
+def create_job_queue(settings: Settings) -> JobQueue:
+    """
+    Builds the job queue configured in the settings.
+
+    A `job_queue_url` starting with redis:// or rediss:// selects the Redis
+    queue; anything else is treated as a SQLite database path. Succeeded
+    jobs are kept as long as idempotent results, since retries from any
+    node attach to them.
+
+    Args:
+        settings (Settings): Application settings.
+
+    Returns:
+        JobQueue: The configured queue.
+    """
+    url = settings.job_queue_url
+    options = {
+        "max_attempts": settings.job_max_attempts,
+        "result_ttl": settings.idempotency_ttl_seconds,
+    }
+    if url.startswith(("redis://", "rediss://")):
+        return RedisJobQueue(url, **options)
+    return SQLiteJobQueue(url, **options)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Returns the process-wide job queue, creating it on first use.
+
+    Returns:
+        JobQueue: Shared queue instance.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = create_job_queue(get_settings())
+    return _queue
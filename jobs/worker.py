@@ -0,0 +1,241 @@
+"""
+Worker process that leases purchase flow jobs from the shared queue.
+
+Usage:
+    python -m jobs.worker
+
+The queue is selected with the JOB_QUEUE_URL setting, so workers can run
+on any machine that reaches the same Redis server (or, on one machine,
+the same SQLite file).
+"""
+
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+from automation.browser_pool import (
+    close_browser_pool,
+    get_browser_pool,
+    run_in_browser,
+)
+from config.logs.logger_config import logger
+from config.settings import get_settings
+from jobs.job_queue import JobLeaseLost, JobQueue, create_job_queue
+from storage.run_history import (
+    STATUS_SUCCESS,
+    close_run_history_store,
+    get_run_history_store,
+)
+
+
+class Worker:
+    """
+    Leases jobs from a queue, runs them and reports their results.
+
+    While a job runs, a background thread keeps extending its lease so
+    long purchase flows are not redelivered. If the worker dies, the lease
+    stops being extended and the job becomes visible to other workers
+    once the visibility timeout passes.
+
+    Attributes:
+        queue (JobQueue): Queue to lease jobs from.
+        handler: Callable receiving a job payload and returning a result dict.
+        worker_id (str): Identifier reported on leased jobs.
+        visibility_timeout (float): Lease duration in seconds.
+        poll_interval (float): Seconds to wait when the queue is empty.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler,
+        worker_id: str = None,
+        visibility_timeout: float = 120,
+        poll_interval: float = 1.0,
+    ):
+        """
+        Initializes the worker.
+
+        Args:
+            queue (JobQueue): Queue to lease jobs from.
+            handler (Callable[[dict], dict]): Runs a job payload.
+            worker_id (str, optional): Worker identifier. Defaults to host, pid
+                and a random suffix.
+            visibility_timeout (float, optional): Lease duration in seconds.
+            poll_interval (float, optional): Idle wait in seconds.
+        """
+        self.queue = queue
+        self.handler = handler
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        )
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+
+    def run_once(self) -> bool:
+        """
+        Leases and runs a single job.
+
+        Returns:
+            bool: True if a job was processed, False if the queue was empty.
+        """
+        job = self.queue.lease(self.worker_id, self.visibility_timeout)
+        if job is None:
+            return False
+
+        logger.info(
+            f"Worker {self.worker_id} leased job {job.job_id} "
+            f"(attempt {job.attempts})"
+        )
+
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job, stop_heartbeat), daemon=True
+        )
+        heartbeat.start()
+
+        try:
+            result = self.handler(job.payload)
+        except Exception as error:
+            traceback.print_exc()
+            outcome = ("fail", str(error))
+        else:
+            outcome = ("complete", result)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+        try:
+            if outcome[0] == "complete":
+                self.queue.complete(job, outcome[1])
+                logger.info(f"Job {job.job_id} succeeded")
+            else:
+                self.queue.fail(job, outcome[1])
+                logger.error(f"Job {job.job_id} failed: {outcome[1]}")
+        except JobLeaseLost as error:
+            logger.warning(f"Result of job {job.job_id} discarded: {error}")
+
+        return True
+
+    def run(
+        self, stop_event: threading.Event = None, max_jobs: int = None
+    ) -> int:
+        """
+        Processes jobs until stopped.
+
+        Args:
+            stop_event (threading.Event, optional): Stops the loop when set.
+            max_jobs (int, optional): Stops after this many jobs.
+
+        Returns:
+            int: Number of jobs processed.
+        """
+        processed = 0
+        logger.info(f"Worker {self.worker_id} started")
+        while not (stop_event and stop_event.is_set()):
+            if max_jobs is not None and processed >= max_jobs:
+                break
+            try:
+                ran = self.run_once()
+            except Exception as error:
+                # A queue outage or a bad job must not kill the worker
+                logger.exception(f"Worker {self.worker_id} error: {error}")
+                ran = False
+
+            if ran:
+                processed += 1
+            else:
+                time.sleep(self.poll_interval)
+        logger.info(f"Worker {self.worker_id} stopped after {processed} jobs")
+        return processed
+
+    def _heartbeat(self, job, stop: threading.Event) -> None:
+        """
+        Extends the lease of a running job until told to stop.
+        """
+        interval = self.visibility_timeout / 3
+        while not stop.wait(interval):
+            try:
+                self.queue.extend_lease(job, self.visibility_timeout)
+            except JobLeaseLost as error:
+                logger.warning(f"Stopped extending job {job.job_id}: {error}")
+                return
+            except Exception as error:
+                logger.warning(f"Could not extend job {job.job_id}: {error}")
+
+
+def run_purchase_job(payload: dict) -> dict:
+    """
+    Runs the purchase flow described by a job payload.
+
+    Args:
+        payload (dict): Job input with email, password and headless.
+
+    Returns:
+        dict: Success flag and message, as returned by /api/run-bot.
+
+    Raises:
+        RuntimeError: If the flow finished with a failed step.
+    """
+    # Imported here so queue-only processes do not load Playwright
+    from automation.test_cases.buy_bot import BuyBot
+
+    settings = get_settings()
+    bot = BuyBot(
+        email=payload["email"],
+        password=payload["password"],
+        headless=payload.get("headless", settings.headless),
+        url=settings.amazon_url,
+        har_mode=settings.har_mode,
+        har_path=settings.har_path,
+        pipeline_tabs=settings.pipeline_tabs,
+        launch_profile=settings.launch_profile,
+    )
+    run = run_in_browser(bot.run_purchase_flow, headless=bot.headless)
+
+    # Raising makes the worker store the job as failed, so retries run again
+    if run.status != STATUS_SUCCESS:
+        raise RuntimeError(
+            f"Purchase flow failed at step {run.error_step!r}: "
+            f"{run.error_message}"
+        )
+
+    return {"success": True, "message": "Purchase flow completed successfully."}
+
+
+def main() -> None:
+    settings = get_settings()
+
+    # Open the run history before any run so its writer thread is ready
+    try:
+        get_run_history_store()
+    except Exception as error:
+        logger.exception(f"Could not open the run history store: {error}")
+
+    # Launch the long-lived browser before the first job arrives
+    pool = get_browser_pool()
+    if settings.prewarm and pool is not None:
+        try:
+            pool.prewarm(headless=True)
+        except Exception as error:
+            logger.warning(f"Browser prewarm failed: {error}")
+
+    worker = Worker(
+        queue=create_job_queue(settings),
+        handler=run_purchase_job,
+        visibility_timeout=settings.job_visibility_timeout,
+    )
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        logger.info(f"Worker {worker.worker_id} interrupted")
+    finally:
+        close_browser_pool()
+        close_run_history_store()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,56 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from api.prewarm import start_prewarm
 from api.routes.bot_routes import router as bot_router
-from config.settings import Settings
-import uvicorn
+from api.routes.health_routes import router as health_router
+from api.routes.run_routes import router as run_router
+from automation.browser_pool import close_browser_pool
+from config.logs.logger_config import logger
+from config.settings import get_settings
+from storage.run_history import close_run_history_store, get_run_history_store
 # from automation.test_cases.buy_bot import BuyBot
 
 # Load settings from .env using your Settings class
-settings = Settings()
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Manages resources that live as long as the application.
+
+    The run history store (and its writer thread) is opened here rather
+    than on the first run's automation thread. The first pooled browser is
+    launched in the background, so the server accepts health checks right
+    away. On shutdown the pooled browsers are closed and pending run
+    history records are written.
+    """
+    try:
+        get_run_history_store()
+    except Exception as error:
+        # Runs still work without history; each one logs the failure
+        logger.exception(f"Could not open the run history store: {error}")
+    start_prewarm(settings)
+    yield
+    close_browser_pool()
+    close_run_history_store()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Amazon Purchase Bot API",
     description="API for automating Amazon purchase flow using Playwright",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
-# Register the route
+# Register the routes
+app.include_router(health_router, tags=["Health"])
 app.include_router(bot_router, prefix="/api", tags=["Bot Automation"])
+app.include_router(run_router, prefix="/api", tags=["Run History"])
 
 # Optional: for development use only (use `uvicorn main:app` instead in prod)
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", host=settings.api_host, port=settings.api_port, reload=True)
@@ -0,0 +1,628 @@
+import hashlib
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+
+from config.logs.logger_config import logger
+from config.settings import get_settings
+
+# Run outcomes stored in the `status` column
+STATUS_SUCCESS = "success"
+STATUS_FAILED = "failed"
+STATUS_ERROR = "error"
+
+# Maximum number of runs returned by a single page of results
+MAX_PAGE_SIZE = 200
+
+# Time window aggregated by stats() when no start time is given (7 days)
+DEFAULT_STATS_WINDOW_SECONDS = 7 * 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL UNIQUE,
+    account_hash TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    duration_ms REAL NOT NULL,
+    status TEXT NOT NULL,
+    error_step TEXT,
+    error_message TEXT,
+    mode TEXT NOT NULL DEFAULT 'live'
+);
+CREATE TABLE IF NOT EXISTS run_steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    position INTEGER NOT NULL,
+    step TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration_ms REAL NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_status_started_at ON runs(status, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_error_step ON runs(error_step, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_account_hash ON runs(account_hash, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_mode_started_at ON runs(mode, started_at);
+CREATE INDEX IF NOT EXISTS idx_run_steps_step_started_at ON run_steps(step, started_at);
+"""
+
+
+def hash_account(email: str) -> str:
+    """
+    Returns a stable, non-reversible identifier for an account email.
+
+    Args:
+        email (str): Account email address.
+
+    Returns:
+        str: Hex SHA-256 digest of the normalized email.
+    """
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()
+
+
+def percentile(values: list, fraction: float):
+    """
+    Computes a percentile using the nearest-rank method.
+
+    Args:
+        values (list): Numeric values.
+        fraction (float): Percentile as a fraction between 0 and 1.
+
+    Returns:
+        float | None: The percentile value, or None if there are no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class RunRecorder:
+    """
+    Collects timing and outcome information for a single automation run.
+
+    Attributes:
+        run_id (str): Unique identifier of the run.
+        account_hash (str): Hashed account email.
+        started_at (float): Start time as a Unix timestamp.
+        ended_at (float): End time as a Unix timestamp, once finished.
+        status (str): Run outcome (success, failed or error).
+        error_step (str): Name of the step where the run failed, if any.
+        error_message (str): Error description, if any.
+        mode (str): Network mode of the run (live, record or replay).
+        steps (list): Recorded steps as dicts.
+    """
+
+    def __init__(self, email: str, run_id: str = None, mode: str = "live"):
+        """
+        Initializes the recorder and marks the start of the run.
+
+        Args:
+            email (str): Account email, stored only as a hash.
+            run_id (str, optional): Run identifier. Generated if omitted.
+            mode (str, optional): Network mode of the run. Defaults to "live".
+        """
+        self.run_id = run_id or uuid.uuid4().hex
+        self.mode = mode
+        self.account_hash = hash_account(email)
+        self.started_at = time.time()
+        self.ended_at = None
+        self.status = None
+        self.error_step = None
+        self.error_message = None
+        self.steps = []
+        self._failed_steps = set()
+        self._started_perf = time.perf_counter()
+
+    @contextmanager
+    def step(self, name: str):
+        """
+        Times a block of the flow as a named step.
+
+        If the block raises, the step and the run are marked as errored and
+        the exception is re-raised. A step reported with fail() while the
+        block runs is stored as failed.
+
+        Args:
+            name (str): Step name.
+        """
+        started_at = time.time()
+        started_perf = time.perf_counter()
+        status = STATUS_SUCCESS
+        try:
+            yield
+        except Exception as error:
+            status = STATUS_ERROR
+            self.mark_error(error, step=name)
+            raise
+        else:
+            if name in self._failed_steps:
+                status = STATUS_FAILED
+        finally:
+            self.steps.append(
+                {
+                    "step": name,
+                    "started_at": started_at,
+                    "duration_ms": (time.perf_counter() - started_perf) * 1000,
+                    "status": status,
+                }
+            )
+
+    def mark_error(self, error: Exception, step: str = None) -> None:
+        """
+        Marks the run as errored, keeping the first error recorded.
+
+        Args:
+            error (Exception): The exception that interrupted the run.
+            step (str, optional): Step where the exception was raised.
+        """
+        if self.status == STATUS_ERROR:
+            return
+        self.status = STATUS_ERROR
+        self.error_step = step
+        self.error_message = str(error)
+
+    def fail(self, step: str, message: str) -> None:
+        """
+        Marks the run as failed at the given step without an exception.
+
+        Only the first failure is kept as the run's error, since later steps
+        usually fail as a consequence of it. The step itself is marked as
+        failed either way.
+
+        Args:
+            step (str): Step where the failure was detected.
+            message (str): Failure description.
+        """
+        if self.status is None:
+            self.status = STATUS_FAILED
+            self.error_step = step
+            self.error_message = message
+        self._failed_steps.add(step)
+        if self.steps and self.steps[-1]["step"] == step:
+            self.steps[-1]["status"] = STATUS_FAILED
+
+    def finish(self) -> None:
+        """
+        Marks the end of the run. Runs without a recorded failure succeed.
+        """
+        self.ended_at = time.time()
+        self.duration_ms = (time.perf_counter() - self._started_perf) * 1000
+        if self.status is None:
+            self.status = STATUS_SUCCESS
+
+
+class RunHistoryStore:
+    """
+    Append-only SQLite store for automation run records.
+
+    Writes are queued and performed by a background thread so that the
+    automation flow never waits on disk I/O. Reads open their own
+    connection; WAL mode lets them run alongside the writer.
+
+    Attributes:
+        db_path (str): Path to the SQLite database file.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initializes the store, creating the schema and the writer thread.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="run-history-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a new connection to the database.
+
+        Returns:
+            sqlite3.Connection: Connection with rows accessible by column name.
+        """
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    # --------------------- Writing ---------------------
+
+    def record(self, run: RunRecorder) -> None:
+        """
+        Queues a finished run to be written by the background thread.
+
+        Args:
+            run (RunRecorder): The finished run.
+        """
+        self._queue.put(run)
+
+    def flush(self) -> None:
+        """
+        Blocks until every queued run has been written.
+        """
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Writes any pending runs and stops the background thread.
+        """
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _write_loop(self) -> None:
+        """
+        Consumes queued runs and inserts them until a stop marker arrives.
+        """
+        connection = self._connect()
+        try:
+            while True:
+                run = self._queue.get()
+                try:
+                    if run is None:
+                        return
+                    self._insert(connection, run)
+                except Exception as error:
+                    logger.exception(
+                        f"Failed to store run history for {run.run_id}: {error}"
+                    )
+                finally:
+                    self._queue.task_done()
+        finally:
+            connection.close()
+
+    def _insert(self, connection: sqlite3.Connection, run: RunRecorder) -> None:
+        """
+        Inserts a run and its steps in a single transaction.
+
+        Args:
+            connection (sqlite3.Connection): Writer connection.
+            run (RunRecorder): The finished run.
+        """
+        with connection:
+            cursor = connection.execute(
+                """
+                INSERT INTO runs (
+                    run_id, account_hash, started_at, ended_at, duration_ms,
+                    status, error_step, error_message, mode
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    run.run_id,
+                    run.account_hash,
+                    run.started_at,
+                    run.ended_at,
+                    run.duration_ms,
+                    run.status,
+                    run.error_step,
+                    run.error_message,
+                    run.mode,
+                ),
+            )
+            connection.executemany(
+                """
+                INSERT INTO run_steps (
+                    run_id, position, step, started_at, duration_ms, status
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        cursor.lastrowid,
+                        position,
+                        step["step"],
+                        step["started_at"],
+                        step["duration_ms"],
+                        step["status"],
+                    )
+                    for position, step in enumerate(run.steps)
+                ],
+            )
+
+    # --------------------- Querying ---------------------
+
+    def list_runs(
+        self,
+        status: str = None,
+        error_step: str = None,
+        account_hash: str = None,
+        mode: str = None,
+        since: float = None,
+        until: float = None,
+        cursor: int = None,
+        limit: int = 50,
+    ) -> tuple:
+        """
+        Lists runs, newest first, with optional filters and cursor pagination.
+
+        Args:
+            status (str, optional): Only runs with this outcome.
+            error_step (str, optional): Only runs that failed at this step.
+            account_hash (str, optional): Only runs for this account hash.
+            mode (str, optional): Only runs in this network mode.
+            since (float, optional): Only runs started at or after this timestamp.
+            until (float, optional): Only runs started before this timestamp.
+            cursor (int, optional): Cursor returned by the previous page.
+            limit (int): Maximum number of runs to return.
+
+        Returns:
+            tuple: (list of run dicts with their steps, next cursor or None).
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        where, params = self._build_filters(
+            status, error_step, account_hash, mode, since, until
+        )
+        if cursor is not None:
+            where.append("id < ?")
+            params.append(cursor)
+
+        query = "SELECT * FROM runs"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(query, params).fetchall()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            runs = [dict(row) for row in rows]
+            steps_by_run = self._load_steps(
+                connection, [run["id"] for run in runs]
+            )
+
+        for run in runs:
+            run["steps"] = steps_by_run.get(run["id"], [])
+
+        next_cursor = runs[-1]["id"] if has_more else None
+        return runs, next_cursor
+
+    def stats(
+        self,
+        since: float = None,
+        until: float = None,
+        step: str = None,
+        mode: str = None,
+        bucket_seconds: int = None,
+    ) -> dict:
+        """
+        Aggregates run outcomes and step durations.
+
+        Percentiles are computed in Python over the matching step rows, so
+        the range is always bounded: without `since`, only the last
+        DEFAULT_STATS_WINDOW_SECONDS before `until` (or now) are read.
+
+        Args:
+            since (float, optional): Only runs started at or after this timestamp.
+            until (float, optional): Only runs started before this timestamp.
+            step (str, optional): Only report durations for this step.
+            mode (str, optional): Only runs in this network mode.
+            bucket_seconds (int, optional): Also group step durations into
+                time buckets of this size (e.g. 3600 for hourly).
+
+        Returns:
+            dict: Aggregated range, totals by status, failures by step and
+            duration percentiles per step (and per bucket when requested).
+        """
+        if since is None:
+            since = (until or time.time()) - DEFAULT_STATS_WINDOW_SECONDS
+
+        where, params = self._build_filters(
+            None, None, None, mode, since, until
+        )
+        clause = (" WHERE " + " AND ".join(where)) if where else ""
+
+        with closing(self._connect()) as connection:
+            by_status = {
+                row["status"]: row["total"]
+                for row in connection.execute(
+                    f"SELECT status, COUNT(*) AS total FROM runs{clause} "
+                    "GROUP BY status",
+                    params,
+                )
+            }
+            failures_by_step = {
+                row["error_step"]: row["total"]
+                for row in connection.execute(
+                    "SELECT error_step, COUNT(*) AS total FROM runs"
+                    + (clause + " AND" if clause else " WHERE")
+                    + " error_step IS NOT NULL"
+                    " GROUP BY error_step ORDER BY total DESC",
+                    params,
+                )
+            }
+
+            step_where, step_params = self._build_filters(
+                None, None, None, None, since, until, table="run_steps"
+            )
+            if mode:
+                # Step rows inherit the mode of their run
+                step_where.append(
+                    "run_id IN (SELECT id FROM runs WHERE mode = ?)"
+                )
+                step_params.append(mode)
+            if step:
+                step_where.append("step = ?")
+                step_params.append(step)
+            step_clause = (
+                (" WHERE " + " AND ".join(step_where)) if step_where else ""
+            )
+            run_durations = self._summarize(
+                [
+                    row["duration_ms"]
+                    for row in connection.execute(
+                        f"SELECT duration_ms FROM runs{clause}", params
+                    )
+                ]
+            )
+
+            step_rows = connection.execute(
+                "SELECT step, started_at, duration_ms FROM run_steps"
+                + step_clause,
+                step_params,
+            ).fetchall()
+
+        durations = {}
+        buckets = {}
+        for row in step_rows:
+            durations.setdefault(row["step"], []).append(row["duration_ms"])
+            if bucket_seconds:
+                bucket = (
+                    int(row["started_at"] // bucket_seconds) * bucket_seconds
+                )
+                buckets.setdefault((row["step"], bucket), []).append(
+                    row["duration_ms"]
+                )
+
+        result = {
+            "since": since,
+            "until": until,
+            "total_runs": sum(by_status.values()),
+            "avg_run_ms": run_durations["avg_ms"],
+            "p95_run_ms": run_durations["p95_ms"],
+            "by_status": by_status,
+            "failures_by_step": failures_by_step,
+            "steps": {
+                name: self._summarize(values)
+                for name, values in durations.items()
+            },
+        }
+        if bucket_seconds:
+            result["buckets"] = [
+                {
+                    "step": name,
+                    "bucket_start": bucket,
+                    **self._summarize(values),
+                }
+                for (name, bucket), values in sorted(
+                    buckets.items(), key=lambda item: (item[0][1], item[0][0])
+                )
+            ]
+        return result
+
+    @staticmethod
+    def _summarize(values: list) -> dict:
+        """
+        Summarizes a list of durations.
+
+        Args:
+            values (list): Durations in milliseconds.
+
+        Returns:
+            dict: Count, average, p50 and p95 durations.
+        """
+        return {
+            "count": len(values),
+            "avg_ms": sum(values) / len(values) if values else None,
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+        }
+
+    @staticmethod
+    def _build_filters(
+        status, error_step, account_hash, mode, since, until, table="runs"
+    ) -> tuple:
+        """
+        Builds WHERE conditions shared by the query methods.
+
+        Returns:
+            tuple: (list of SQL conditions, list of parameters).
+        """
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if error_step:
+            where.append("error_step = ?")
+            params.append(error_step)
+        if account_hash:
+            where.append("account_hash = ?")
+            params.append(account_hash)
+        if mode:
+            where.append("mode = ?")
+            params.append(mode)
+        if since is not None:
+            where.append(f"{table}.started_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append(f"{table}.started_at < ?")
+            params.append(until)
+        return where, params
+
+    @staticmethod
+    def _load_steps(connection: sqlite3.Connection, run_ids: list) -> dict:
+        """
+        Loads the steps for a set of runs.
+
+        Args:
+            connection (sqlite3.Connection): Reader connection.
+            run_ids (list): Internal run row ids.
+
+        Returns:
+            dict: Lists of step dicts keyed by run row id.
+        """
+        if not run_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in run_ids)
+        rows = connection.execute(
+            "SELECT run_id, step, started_at, duration_ms, status "
+            f"FROM run_steps WHERE run_id IN ({placeholders}) "
+            "ORDER BY run_id, position",
+            run_ids,
+        ).fetchall()
+
+        steps = {}
+        for row in rows:
+            step = dict(row)
+            steps.setdefault(step.pop("run_id"), []).append(step)
+        return steps
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_run_history_store() -> RunHistoryStore:
+    """
+    Returns the process-wide run history store, creating it on first use.
+
+    Returns:
+        RunHistoryStore: Shared store instance.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RunHistoryStore(get_settings().run_history_db)
+    return _store
+
+
+def close_run_history_store() -> None:
+    """
+    Flushes and closes the shared store if it was created.
+    """
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
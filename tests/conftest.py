@@ -0,0 +1,13 @@
+import pytest
+
+from config.logs.logger_config import file_handler, logger
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _console_logging_only():
+    """
+    Keeps test runs from rotating the automation log in logs/.
+    """
+    logger.removeHandler(file_handler)
+    yield
+    logger.addHandler(file_handler)
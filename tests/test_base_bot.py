@@ -0,0 +1,95 @@
+import json
+import os
+import stat
+import threading
+
+from automation import base_bot
+from automation.base_bot import BaseBot, scrub_har
+
+
+def har_entry(method, url, headers, post_data=None):
+    request = {
+        "method": method,
+        "url": url,
+        "headers": headers,
+        "cookies": [{"name": "session-id", "value": "abc"}],
+    }
+    if post_data is not None:
+        request["postData"] = post_data
+    response = {
+        "status": 200,
+        "headers": [{"name": "Set-Cookie", "value": "session-id=abc"}],
+        "cookies": [{"name": "session-id", "value": "abc"}],
+        "content": {"text": "<html></html>"},
+    }
+    return {"request": request, "response": response}
+
+
+def test_scrub_har_removes_cookies_and_credentials(tmp_path):
+    har_path = tmp_path / "flow.har"
+    login = {
+        "mimeType": "application/x-www-form-urlencoded",
+        "text": "email=user%40example.com&password=secret&appAction=SIGNIN",
+    }
+    search = {"mimeType": "application/json", "text": '{"query": "tv"}'}
+    har = {
+        "log": {
+            "entries": [
+                har_entry(
+                    "POST",
+                    "https://www.amazon.com.mx/ap/signin",
+                    [
+                        {"name": "cookie", "value": "session-id=abc"},
+                        {
+                            "name": "Referer",
+                            "value": "https://www.amazon.com.mx",
+                        },
+                    ],
+                    login,
+                ),
+                har_entry(
+                    "POST",
+                    "https://www.amazon.com.mx/search",
+                    [{"name": "Authorization", "value": "Bearer token"}],
+                    search,
+                ),
+            ]
+        }
+    }
+    har_path.write_text(json.dumps(har), encoding="utf-8")
+
+    scrub_har(str(har_path))
+
+    scrubbed = har_path.read_text(encoding="utf-8")
+    assert "secret" not in scrubbed
+    assert "session-id" not in scrubbed
+    assert "Bearer" not in scrubbed
+
+    login_entry, search_entry = json.loads(scrubbed)["log"]["entries"]
+    assert "postData" not in login_entry["request"]
+    assert login_entry["request"]["headers"] == [
+        {"name": "Referer", "value": "https://www.amazon.com.mx"}
+    ]
+    assert login_entry["response"]["headers"] == []
+    assert login_entry["response"]["content"] == {"text": "<html></html>"}
+    # Bodies without credentials are kept, replay matches them exactly
+    assert search_entry["request"]["postData"] == search
+
+
+def test_published_recording_is_scrubbed_and_private(tmp_path, monkeypatch):
+    har_path = tmp_path / "flow.har"
+    bot = BaseBot(headless=True, har_mode="record", har_path=str(har_path))
+    bot._recording_path = str(tmp_path / "flow.recording.har")
+    with open(bot._recording_path, "w", encoding="utf-8") as recording:
+        json.dump(
+            {"log": {"entries": [har_entry("GET", "https://a.test", [])]}},
+            recording,
+        )
+    monkeypatch.setattr(base_bot, "_har_record_lock", threading.Lock())
+    base_bot._har_record_lock.acquire()
+
+    bot._release_recording(keep=True)
+
+    assert stat.S_IMODE(os.stat(har_path).st_mode) == 0o600
+    assert "session-id" not in har_path.read_text(encoding="utf-8")
+    assert not base_bot._har_record_lock.locked()
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException, Response
+
+from api.idempotency import RunCoordinator
+from api.routes import bot_routes
+from api.routes.bot_routes import RunBotRequest, _enqueue_purchase_flow
+from config.settings import Settings
+from jobs import worker
+from jobs.job_queue import JOB_FAILED, JobTimeout, SQLiteJobQueue
+from storage.run_history import RunRecorder
+
+
+@pytest.fixture
+def settings():
+    return Settings(
+        amazon_url="https://www.example.com",
+        run_mode="queue",
+        job_result_timeout=1,
+    )
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(bot_routes, "get_job_queue", lambda: queue)
+    return queue
+
+
+def test_unstarted_job_is_cancelled_when_the_wait_times_out(queue, settings):
+    request = RunBotRequest(email="user@example.com", password="secret")
+    with pytest.raises(JobTimeout):
+        _enqueue_purchase_flow(request, settings, "key-1", "fingerprint")
+
+    job_id = bot_routes.request_fingerprint("key-1", "fingerprint")
+    assert queue.get(job_id)["status"] == JOB_FAILED
+    assert queue.lease("worker-1", visibility_timeout=30) is None
+
+
+def test_retry_attaches_to_the_running_job(queue, settings):
+    request = RunBotRequest(email="user@example.com", password="secret")
+    leased = []
+
+    def slow_worker():
+        while not leased:
+            leased.extend(filter(None, [queue.lease("worker-1", 30)]))
+            time.sleep(0.05)
+        # Outlives the first wait, finishes during the retry
+        time.sleep(1.5)
+        queue.complete(leased[0], {"success": True, "message": "done"})
+
+    worker = threading.Thread(target=slow_worker)
+    worker.start()
+    with pytest.raises(JobTimeout):
+        _enqueue_purchase_flow(request, settings, "key-1", "fingerprint")
+
+    response = _enqueue_purchase_flow(request, settings, "key-1", "fingerprint")
+    worker.join()
+
+    assert response.message == "done"
+    assert queue.lease("worker-2", visibility_timeout=30) is None
+
+
+def test_failed_inline_run_is_an_error_and_not_cached(monkeypatch):
+    calls = []
+
+    def failed_run(action, headless):
+        calls.append(headless)
+        run = RunRecorder("user@example.com")
+        run.fail("validate_login", "Login validation failed.")
+        run.finish()
+        return run
+
+    monkeypatch.setattr(
+        bot_routes,
+        "get_settings",
+        lambda: Settings(amazon_url="https://www.example.com"),
+    )
+    monkeypatch.setattr(bot_routes, "run_in_browser", failed_run)
+    coordinator = RunCoordinator(ttl_seconds=600, max_entries=10)
+    monkeypatch.setattr(bot_routes, "get_run_coordinator", lambda: coordinator)
+    request = RunBotRequest(email="user@example.com", password="secret")
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as raised:
+            bot_routes.run_bot(request, Response(), idempotency_key="key-1")
+        assert raised.value.status_code == 500
+        assert "validate_login" in raised.value.detail
+
+    # The retry ran the flow again instead of replaying a success
+    assert len(calls) == 2
+
+
+def test_failed_queued_run_fails_the_job(monkeypatch):
+    def failed_run(action, headless):
+        run = RunRecorder("user@example.com")
+        run.fail("confirm_cart", "Could not confirm the item is in the cart.")
+        run.finish()
+        return run
+
+    monkeypatch.setattr(
+        worker,
+        "get_settings",
+        lambda: Settings(amazon_url="https://www.example.com"),
+    )
+    monkeypatch.setattr(worker, "run_in_browser", failed_run)
+
+    with pytest.raises(RuntimeError, match="confirm_cart"):
+        worker.run_purchase_job(
+            {"email": "user@example.com", "password": "secret"}
+        )
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import playwright.sync_api
+import pytest
+
+from automation.browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    def __init__(self, headless):
+        self.headless = headless
+        self.thread = threading.current_thread()
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        # Playwright objects only work on the thread that created them
+        assert threading.current_thread() is self.thread
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self, launched):
+        self.chromium = self
+        self.launched = launched
+
+    def start(self):
+        return self
+
+    def launch(self, headless, args):
+        browser = FakeBrowser(headless)
+        self.launched.append(browser)
+        return browser
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def launched(monkeypatch):
+    launched = []
+    monkeypatch.setattr(
+        playwright.sync_api, "sync_playwright", lambda: FakePlaywright(launched)
+    )
+    return launched
+
+
+@pytest.fixture
+def pool(launched):
+    pool = BrowserPool(size=2, launch_profile="default")
+    yield pool
+    pool.close()
+
+
+def test_runs_reuse_the_browser_on_its_own_thread(pool, launched):
+    pool.prewarm()
+    browsers = [pool.run(lambda browser: browser) for _ in range(20)]
+
+    # Sequential runs never need a second browser
+    assert len(launched) == 1
+    assert all(browser is launched[0] for browser in browsers)
+    assert launched[0].thread is not threading.current_thread()
+
+
+def test_first_run_without_prewarm_launches_one_browser(pool, launched):
+    for _ in range(20):
+        pool.run(lambda browser: None)
+
+    assert len(launched) == 1
+
+
+def test_disconnected_browser_is_relaunched(pool, launched):
+    pool.run(lambda browser: None)
+    launched[0].connected = False
+
+    browser = pool.run(lambda browser: browser)
+
+    assert len(launched) == 2
+    assert browser is launched[1]
+
+
+def test_concurrent_runs_are_bounded_by_pool_size(pool, launched):
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def action(browser):
+        with lock:
+            running.append(browser)
+            peak.append(len(running))
+        time.sleep(0.1)
+        with lock:
+            running.remove(browser)
+
+    callers = [
+        threading.Thread(target=pool.run, args=(action,)) for _ in range(5)
+    ]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+
+    assert len(launched) == 2
+    assert max(peak) == 2
+
+
+def test_action_errors_reach_the_caller(pool):
+    def action(browser):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        pool.run(action)
+    assert pool.run(lambda browser: "still serving") == "still serving"
+
+
+def test_close_closes_browsers_on_their_threads(launched):
+    pool = BrowserPool(size=1, launch_profile="default")
+    pool.run(lambda browser: None, headless=False)
+    pool.close()
+
+    assert launched[0].closed
+    assert launched[0].headless is False
+    with pytest.raises(RuntimeError):
+        pool.run(lambda browser: None)
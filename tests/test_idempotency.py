@@ -0,0 +1,227 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from api import idempotency
+from api.idempotency import IdempotencyKeyMismatch, RunCoordinator
+
+
+@pytest.fixture
+def coordinator():
+    return RunCoordinator(ttl_seconds=600, max_entries=10)
+
+
+@pytest.fixture
+def attached(monkeypatch):
+    """
+    Semaphore released whenever a request starts waiting on an in-flight run.
+    """
+    attached = threading.Semaphore(0)
+
+    class AttachedFuture(Future):
+        def result(self, timeout=None):
+            attached.release()
+            return super().result(timeout)
+
+    monkeypatch.setattr(idempotency, "Future", AttachedFuture)
+    return attached
+
+
+def start_owner(coordinator, key, action, outcomes):
+    """
+    Starts a run in a thread and waits until it is in flight.
+    """
+    started = threading.Event()
+
+    def owned_action():
+        started.set()
+        return action()
+
+    def call():
+        try:
+            outcomes.append(
+                coordinator.run(key, "user@example.com", "fp", owned_action)
+            )
+        except Exception as error:
+            outcomes.append(error)
+
+    owner = threading.Thread(target=call)
+    owner.start()
+    assert started.wait(5)
+    return owner
+
+
+def attach(coordinator, key, count, outcomes, attached):
+    """
+    Starts requests for an in-flight key and waits until all are attached.
+    """
+    waiters = [
+        threading.Thread(
+            target=lambda: outcomes.append(
+                capture(coordinator.run, key, "user@example.com", "fp", None)
+            )
+        )
+        for _ in range(count)
+    ]
+    for waiter in waiters:
+        waiter.start()
+    for _ in waiters:
+        assert attached.acquire(timeout=5)
+    return waiters
+
+
+def capture(call, *args):
+    try:
+        return call(*args)
+    except Exception as error:
+        return error
+
+
+def test_concurrent_requests_with_one_key_run_once(coordinator, attached):
+    calls = []
+    release = threading.Event()
+
+    def action():
+        calls.append(1)
+        release.wait(5)
+        return "done"
+
+    outcomes = []
+    owner = start_owner(coordinator, "key", action, outcomes)
+    waiters = attach(coordinator, "key", 4, outcomes, attached)
+    release.set()
+    for thread in [owner, *waiters]:
+        thread.join()
+
+    assert len(calls) == 1
+    assert (
+        sorted(outcomes, key=lambda outcome: outcome[1])
+        == [("done", False)] + [("done", True)] * 4
+    )
+    # Later requests are served from the cache
+    assert coordinator.run("key", "user@example.com", "fp", None) == (
+        "done",
+        True,
+    )
+
+
+def test_reused_key_with_another_request_is_rejected(coordinator):
+    release = threading.Event()
+    outcomes = []
+    owner = start_owner(
+        coordinator, "key", lambda: release.wait(5) and "done", outcomes
+    )
+
+    # While in flight
+    with pytest.raises(IdempotencyKeyMismatch):
+        coordinator.run("key", "user@example.com", "other-fp", None)
+    release.set()
+    owner.join()
+
+    # And once cached
+    with pytest.raises(IdempotencyKeyMismatch):
+        coordinator.run("key", "user@example.com", "other-fp", None)
+
+
+def test_owner_error_reaches_waiters_and_is_not_cached(coordinator, attached):
+    calls = []
+    release = threading.Event()
+
+    def action():
+        calls.append(1)
+        release.wait(5)
+        raise ValueError("boom")
+
+    outcomes = []
+    owner = start_owner(coordinator, "key", action, outcomes)
+    waiters = attach(coordinator, "key", 3, outcomes, attached)
+    release.set()
+    for thread in [owner, *waiters]:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(outcomes) == 4
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+    # A retry runs again
+    result = coordinator.run("key", "user@example.com", "fp", lambda: "done")
+    assert result == ("done", False)
+
+
+def test_results_expire_after_ttl():
+    coordinator = RunCoordinator(ttl_seconds=0, max_entries=10)
+    calls = []
+
+    def action():
+        calls.append(1)
+        return len(calls)
+
+    assert coordinator.run("key", "user@example.com", "fp", action) == (
+        1,
+        False,
+    )
+    assert coordinator.run("key", "user@example.com", "fp", action) == (
+        2,
+        False,
+    )
+
+
+def test_least_recently_used_result_is_evicted():
+    coordinator = RunCoordinator(ttl_seconds=600, max_entries=2)
+    calls = []
+
+    def run(key):
+        def action():
+            calls.append(key)
+            return key
+
+        return coordinator.run(key, "user@example.com", key, action)
+
+    run("a")
+    run("b")
+    assert run("a") == ("a", True)
+    run("c")
+
+    # "b" was the least recently used, "a" was refreshed by its replay
+    assert run("a") == ("a", True)
+    assert run("b") == ("b", False)
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_runs_are_serialized_per_account(coordinator):
+    lock = threading.Lock()
+    running = {}
+    peak = {}
+    other_account_ran = threading.Event()
+    waits = []
+
+    def action(account):
+        with lock:
+            running[account] = running.get(account, 0) + 1
+            peak[account] = max(peak.get(account, 0), running[account])
+        if account == "a@example.com":
+            # Only succeeds if the other account is not queued behind it
+            waits.append(other_account_ran.wait(5))
+        else:
+            other_account_ran.set()
+        with lock:
+            running[account] -= 1
+        return account
+
+    callers = [
+        threading.Thread(
+            target=coordinator.run,
+            args=(None, email, "fp", lambda email=email: action(email)),
+        )
+        for email in ["a@example.com"] * 3 + ["b@example.com"] * 3
+    ]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+
+    assert waits == [True] * 3
+    assert peak == {"a@example.com": 1, "b@example.com": 1}
+    # Account locks are dropped once no run needs them
+    assert coordinator._account_locks == {}
@@ -0,0 +1,223 @@
+import multiprocessing
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from benchmarks.worker_throughput import drain, simulated_run
+from jobs.job_queue import (
+    JOB_EXPIRED_ERROR,
+    JOB_FAILED,
+    JOB_LEASED,
+    JOB_QUEUED,
+    JOB_SUCCEEDED,
+    JobLeaseLost,
+    SQLiteJobQueue,
+)
+from jobs.worker import Worker
+
+
+def stored_payload(queue: SQLiteJobQueue, job_id: str):
+    """
+    Reads the raw payload column of a job.
+    """
+    with sqlite3.connect(queue.db_path) as connection:
+        row = connection.execute(
+            "SELECT payload FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+    return row[0]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / "jobs.db"))
+
+
+def test_completed_job_keeps_result_and_drops_payload(queue):
+    job_id = queue.enqueue({"password": "secret"})
+
+    job = queue.lease("worker-1", visibility_timeout=30)
+    assert job.job_id == job_id
+    assert job.payload == {"password": "secret"}
+    assert queue.lease("worker-2", visibility_timeout=30) is None
+
+    queue.complete(job, {"success": True})
+
+    assert queue.get(job_id)["status"] == JOB_SUCCEEDED
+    assert queue.get(job_id)["result"] == {"success": True}
+    assert stored_payload(queue, job_id) is None
+
+
+def test_enqueue_with_existing_id_attaches_to_job(queue):
+    assert queue.enqueue({"n": 1}, job_id="key") == "key"
+    assert queue.enqueue({"n": 2}, job_id="key") == "key"
+
+    job = queue.lease("worker-1", visibility_timeout=30)
+    assert job.payload == {"n": 1}
+    assert queue.lease("worker-1", visibility_timeout=30) is None
+
+    # A succeeded job is reused, so the retry gets its result
+    queue.complete(job, {"success": True})
+    queue.enqueue({"n": 3}, job_id="key")
+    assert queue.get("key")["status"] == JOB_SUCCEEDED
+
+
+def test_enqueue_requeues_failed_job(queue):
+    queue.enqueue({"n": 1}, job_id="key")
+    queue.fail(queue.lease("worker-1", visibility_timeout=30), "boom")
+
+    queue.enqueue({"n": 2}, job_id="key")
+
+    job = queue.lease("worker-1", visibility_timeout=30)
+    assert job.payload == {"n": 2}
+    assert job.attempts == 1
+
+
+def test_enqueue_requeues_succeeded_job_after_result_ttl(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.db"), result_ttl=0)
+    queue.enqueue({"n": 1}, job_id="key")
+    queue.complete(queue.lease("worker-1", visibility_timeout=30), {})
+
+    queue.enqueue({"n": 2}, job_id="key")
+
+    assert queue.get("key")["status"] == JOB_QUEUED
+
+
+def test_jobs_of_one_group_never_run_concurrently(queue):
+    first = queue.enqueue({"n": 1}, group="account-a")
+    second = queue.enqueue({"n": 2}, group="account-a")
+    other = queue.enqueue({"n": 3}, group="account-b")
+
+    job = queue.lease("worker-1", visibility_timeout=30)
+    assert job.job_id == first
+
+    # The second job of account-a waits; account-b is free
+    assert queue.lease("worker-2", visibility_timeout=30).job_id == other
+    assert queue.lease("worker-3", visibility_timeout=30) is None
+
+    queue.complete(job, {})
+    assert queue.lease("worker-3", visibility_timeout=30).job_id == second
+
+
+def test_group_is_released_when_lease_expires(queue):
+    first = queue.enqueue({"n": 1}, group="account-a")
+    queue.enqueue({"n": 2}, group="account-a")
+
+    queue.lease("worker-1", visibility_timeout=0.05)
+    time.sleep(0.1)
+
+    # The expired job is delivered again before the next one of its group
+    assert queue.lease("worker-2", visibility_timeout=30).job_id == first
+
+
+def test_cancel_drops_payload_of_queued_job_only(queue):
+    queued = queue.enqueue({"password": "secret"})
+    assert queue.cancel(queued, "Cancelled")
+    assert queue.get(queued)["status"] == JOB_FAILED
+    assert queue.get(queued)["error"] == "Cancelled"
+    assert stored_payload(queue, queued) is None
+
+    leased = queue.enqueue({"password": "secret"})
+    queue.lease("worker-1", visibility_timeout=30)
+    assert not queue.cancel(leased, "Cancelled")
+    assert queue.get(leased)["status"] == JOB_LEASED
+
+
+def test_job_expires_if_never_leased(queue):
+    job_id = queue.enqueue({"password": "secret"}, expires_in=0.05)
+    time.sleep(0.1)
+
+    assert queue.lease("worker-1", visibility_timeout=30) is None
+    job = queue.get(job_id)
+    assert job["status"] == JOB_FAILED
+    assert job["error"] == JOB_EXPIRED_ERROR
+    assert stored_payload(queue, job_id) is None
+
+
+def test_worker_that_lost_its_lease_cannot_report(queue):
+    job_id = queue.enqueue({"n": 1})
+    stale = queue.lease("worker-1", visibility_timeout=0.05)
+    time.sleep(0.1)
+    current = queue.lease("worker-2", visibility_timeout=30)
+
+    with pytest.raises(JobLeaseLost):
+        queue.complete(stale, {})
+    with pytest.raises(JobLeaseLost):
+        queue.extend_lease(stale, 30)
+
+    queue.complete(current, {"success": True})
+    assert queue.get(job_id)["attempts"] == 2
+
+
+def test_job_fails_after_max_attempts(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.db"), max_attempts=1)
+    job_id = queue.enqueue({"n": 1})
+    queue.lease("worker-1", visibility_timeout=0.05)
+    time.sleep(0.1)
+
+    assert queue.lease("worker-2", visibility_timeout=30) is None
+    assert queue.get(job_id)["status"] == JOB_FAILED
+    assert stored_payload(queue, job_id) is None
+
+
+def test_worker_loop_survives_lease_errors(queue):
+    class FlakyQueue(SQLiteJobQueue):
+        failures = 1
+
+        def _lease(self, *args):
+            if self.failures:
+                self.failures -= 1
+                raise sqlite3.OperationalError("database is locked")
+            return super()._lease(*args)
+
+    flaky = FlakyQueue(queue.db_path)
+    job_id = flaky.enqueue({"duration": 0})
+    worker = Worker(
+        flaky, simulated_run, visibility_timeout=30, poll_interval=0
+    )
+
+    assert worker.run(stop_event=threading.Event(), max_jobs=1) == 1
+    assert flaky.get(job_id)["status"] == JOB_SUCCEEDED
+
+
+def test_several_worker_processes_drain_the_queue(queue):
+    job_ids = [queue.enqueue({"duration": 0.05}) for _ in range(20)]
+
+    processes = [
+        multiprocessing.Process(target=drain, args=(queue.db_path, 30))
+        for _ in range(3)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    jobs = [queue.get(job_id) for job_id in job_ids]
+    assert all(job["status"] == JOB_SUCCEEDED for job in jobs)
+    assert all(job["attempts"] == 1 for job in jobs)
+    assert len({job["worker_id"] for job in jobs}) > 1
+
+
+def test_job_of_killed_worker_is_redelivered(queue):
+    job_id = queue.enqueue({"duration": 2})
+
+    crashing = multiprocessing.Process(target=drain, args=(queue.db_path, 1))
+    crashing.start()
+    while queue.get(job_id)["status"] != JOB_LEASED:
+        time.sleep(0.05)
+    crashing.kill()
+    crashing.join()
+
+    # Still hidden until the 1 s lease expires
+    assert queue.lease("probe", visibility_timeout=30) is None
+    time.sleep(1.2)
+
+    survivor = multiprocessing.Process(target=drain, args=(queue.db_path, 5))
+    survivor.start()
+    survivor.join(timeout=60)
+
+    job = queue.get(job_id)
+    assert job["status"] == JOB_SUCCEEDED
+    assert job["attempts"] == 2
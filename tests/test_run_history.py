@@ -0,0 +1,206 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import run_routes
+from storage.run_history import (
+    DEFAULT_STATS_WINDOW_SECONDS,
+    STATUS_FAILED,
+    STATUS_SUCCESS,
+    RunHistoryStore,
+    RunRecorder,
+    hash_account,
+)
+
+# Fixed start of the recorded runs, on an hour boundary
+BASE_TIME = 1_700_000_000 // 3600 * 3600
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RunHistoryStore(str(tmp_path / "runs.db"))
+    yield store
+    store.close()
+
+
+def record_run(
+    store,
+    started_at,
+    email="user@example.com",
+    mode="live",
+    failed_step=None,
+    step_ms=(100, 200),
+):
+    """
+    Stores a finished run with a login and a checkout step.
+    """
+    run = RunRecorder(email, mode=mode)
+    run.started_at = started_at
+    run.ended_at = started_at + sum(step_ms) / 1000
+    run.duration_ms = sum(step_ms)
+    run.steps = [
+        {
+            "step": name,
+            "started_at": started_at,
+            "duration_ms": duration_ms,
+            "status": STATUS_SUCCESS,
+        }
+        for name, duration_ms in zip(("login", "checkout"), step_ms)
+    ]
+    if failed_step:
+        run.fail(failed_step, f"{failed_step} failed")
+    run.status = run.status or STATUS_SUCCESS
+    store.record(run)
+    store.flush()
+    return run
+
+
+def test_list_runs_pages_newest_first(store):
+    runs = [record_run(store, BASE_TIME + offset) for offset in range(5)]
+
+    pages = []
+    cursor = None
+    while True:
+        page, cursor = store.list_runs(cursor=cursor, limit=2)
+        pages.append([run["run_id"] for run in page])
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sum(pages, []) == [run.run_id for run in reversed(runs)]
+
+
+def test_list_runs_includes_steps_in_order(store):
+    record_run(store, BASE_TIME)
+
+    (run,), _ = store.list_runs()
+
+    assert [step["step"] for step in run["steps"]] == ["login", "checkout"]
+    assert run["steps"][0]["duration_ms"] == 100
+
+
+def test_list_runs_filters(store):
+    success = record_run(store, BASE_TIME)
+    failed = record_run(store, BASE_TIME + 1, failed_step="checkout")
+    other = record_run(store, BASE_TIME + 2, email="other@example.com")
+    replay = record_run(store, BASE_TIME + 3, mode="replay")
+
+    def ids(**filters):
+        return [run["run_id"] for run in store.list_runs(**filters)[0]]
+
+    assert ids(status=STATUS_FAILED) == [failed.run_id]
+    assert ids(error_step="checkout") == [failed.run_id]
+    assert ids(account_hash=hash_account("Other@Example.com ")) == [
+        other.run_id
+    ]
+    assert ids(mode="replay") == [replay.run_id]
+    assert ids(since=BASE_TIME + 1, until=BASE_TIME + 3) == [
+        other.run_id,
+        failed.run_id,
+    ]
+    assert success.run_id in ids()
+
+
+def test_stats_counts_outcomes_and_failing_steps(store):
+    record_run(store, BASE_TIME, step_ms=(100, 200))
+    record_run(store, BASE_TIME + 1, failed_step="checkout", step_ms=(300, 400))
+    record_run(store, BASE_TIME + 2, mode="replay", step_ms=(10, 20))
+
+    stats = store.stats(since=BASE_TIME, until=BASE_TIME + 60)
+
+    assert stats["total_runs"] == 3
+    assert stats["by_status"] == {STATUS_SUCCESS: 2, STATUS_FAILED: 1}
+    assert stats["failures_by_step"] == {"checkout": 1}
+    assert stats["steps"]["login"]["count"] == 3
+    assert stats["steps"]["login"]["p50_ms"] == 100
+    assert stats["steps"]["login"]["p95_ms"] == 300
+    assert "buckets" not in stats
+
+
+def test_stats_filters_by_mode_and_step(store):
+    record_run(store, BASE_TIME, step_ms=(100, 200))
+    record_run(store, BASE_TIME + 1, mode="replay", step_ms=(10, 20))
+
+    replay = store.stats(since=BASE_TIME, mode="replay")
+    assert replay["total_runs"] == 1
+    assert replay["avg_run_ms"] == 30
+    assert replay["steps"]["checkout"]["avg_ms"] == 20
+
+    login = store.stats(since=BASE_TIME, step="login")
+    assert set(login["steps"]) == {"login"}
+    assert login["steps"]["login"]["count"] == 2
+
+
+def test_stats_groups_step_durations_into_buckets(store):
+    record_run(store, BASE_TIME, step_ms=(100, 200))
+    record_run(store, BASE_TIME + 60, step_ms=(300, 400))
+    record_run(store, BASE_TIME + 3600, step_ms=(500, 600))
+
+    stats = store.stats(since=BASE_TIME, step="login", bucket_seconds=3600)
+
+    assert [
+        (bucket["bucket_start"], bucket["count"], bucket["avg_ms"])
+        for bucket in stats["buckets"]
+    ] == [(BASE_TIME, 2, 200), (BASE_TIME + 3600, 1, 500)]
+
+
+def test_stats_defaults_to_the_last_seven_days(store):
+    now = time.time()
+    record_run(store, now - DEFAULT_STATS_WINDOW_SECONDS - 60)
+    recent = now - 60
+    record_run(store, recent)
+
+    stats = store.stats()
+    assert stats["total_runs"] == 1
+    assert stats["since"] == pytest.approx(
+        now - DEFAULT_STATS_WINDOW_SECONDS, abs=5
+    )
+
+    # The window ends at `until` when only that is given
+    stats = store.stats(until=recent)
+    assert stats["since"] == recent - DEFAULT_STATS_WINDOW_SECONDS
+    assert stats["total_runs"] == 1
+
+
+def test_run_endpoints(store, monkeypatch):
+    monkeypatch.setattr(run_routes, "get_run_history_store", lambda: store)
+    app = FastAPI()
+    app.include_router(run_routes.router, prefix="/api")
+    client = TestClient(app)
+    for offset in range(3):
+        record_run(store, BASE_TIME + offset)
+    record_run(store, BASE_TIME + 3, failed_step="checkout")
+
+    first = client.get("/api/runs", params={"limit": 2})
+    assert first.status_code == 200
+    assert len(first.json()["runs"]) == 2
+    assert first.json()["runs"][0]["error_step"] == "checkout"
+    second = client.get(
+        "/api/runs",
+        params={"limit": 2, "cursor": first.json()["next_cursor"]},
+    )
+    assert len(second.json()["runs"]) == 2
+    assert second.json()["next_cursor"] is None
+
+    failed = client.get("/api/runs", params={"status": STATUS_FAILED})
+    assert [run["status"] for run in failed.json()["runs"]] == [STATUS_FAILED]
+    assert client.get("/api/runs", params={"limit": 0}).status_code == 422
+
+    stats = client.get(
+        "/api/runs/stats",
+        params={"since": "2023-11-14T00:00:00Z", "bucket": "hour"},
+    )
+    assert stats.status_code == 200
+    body = stats.json()
+    assert body["total_runs"] == 4
+    assert body["failures_by_step"] == {"checkout": 1}
+    assert {bucket["step"] for bucket in body["buckets"]} == {
+        "login",
+        "checkout",
+    }
+    assert (
+        client.get("/api/runs/stats", params={"bucket": "week"}).status_code
+        == 422
+    )